@@ -4,29 +4,13 @@ Library of functions for PAN-OS policy management.
 This package contains modules for handling various aspects of firewall policy
 configuration, including address objects, application filters, security profiles,
 and policy rules.
+
+Submodules are loaded lazily (PEP 562): a submodule is imported on first access
+as an attribute of the package (e.g. ``lib.build_policy``), so importing a single
+module such as ``lib.category_parser`` does not pull in the whole PAN-OS stack.
 """
 
-from . import address_objects_staging
-from . import application_filters
-from . import application_groups
-from . import auxiliary_functions
-from . import build_policy
-from . import category_parser
-from . import custom_objects
-from . import decryption_policy
-from . import edls
-from . import log_forwarding_profiles
-from . import manage_tags
-from . import security_policy_post
-from . import security_policy_pre
-from . import security_profile_groups
-from . import security_profile_url_filtering
-from . import service_now
-from . import service_objects
-from . import template_generator
-from . import url_categories
-from . import user_groups
-from . import rich_output
+import importlib
 
 __all__ = [
     'address_objects_staging',
@@ -51,3 +35,17 @@ __all__ = [
     'user_groups',
     'rich_output'
 ]
+
+_SUBMODULES = frozenset(__all__)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBMODULES)
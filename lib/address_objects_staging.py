@@ -11,18 +11,43 @@ This module provides functionality to:
 - Handle address objects for Active Directory Domain Controllers
 """
 
-import settings
-import requests
-import dns.resolver
-import urllib3
+import io
+import json
+import os.path
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 
-from rich import print
+import settings
+from lib.rich_output import plain_console
 from ngfw.objects.tags.tags import tags
 from panos.panorama         import DeviceGroup
 from lib.auxiliary_functions import find_address_groups_delta, find_address_objects_delta
 from lib.auxiliary_functions import parse_metadata_from_csv, execute_multi_config_api_call
 from panos.objects          import AddressObject, AddressGroup, DynamicUserGroup
 
+# Human-readable address types used in the CSV file mapped to the respective API keywords
+# (any other type is treated as 'ip-netmask')
+ADDRESS_TYPES = {
+    'IP Wildcard':  'ip-wildcard',
+    'IP Range':     'ip-range',
+    'FQDN':         'fqdn',
+}
+
+# Columns of the address objects CSV file read by stage_address_objects (named tuple field -> CSV column)
+ADDRESS_OBJECTS_COLUMNS = {
+    'name':                 'Name',
+    'type':                 'Type',
+    'value':                'Address',
+    'tags':                 'Tags',
+    'description':          'Description',
+    'group_name':           'Group Name',
+    'group_description':    'Group Description',
+}
+
+# A normalized row of the address objects CSV file
+AddressEntry = namedtuple('AddressEntry', 'name type value tags description group_name group_description')
+
 
 def handle_address_objects_and_groups(object_container, panos_device):
     """
@@ -43,25 +68,28 @@ def handle_address_objects_and_groups(object_container, panos_device):
         staging_dg (DeviceGroup): The staging device group containing desired address objects
                                   and groups to synchronize with the firewall.
     """
+    # Settings used inside the loops below are read once
+    verbose = settings.VERBOSE_OUTPUT
+
     panos_device.add(object_container)
 
     # =====================================================================================================
     # Get current address objects
-    print('Looking for existing address objects...', end='')
+    plain_console.print('Looking for existing address objects...', end='')
     current_address_objects = AddressObject.refreshall(object_container)
-    print(f"found {len(current_address_objects)} address objects", end="")
-    if settings.VERBOSE_OUTPUT and len(current_address_objects) != 0:
-        print(':')
-        for address_object in current_address_objects: print(f'\t - {address_object.name}')
+    plain_console.print(f"found {len(current_address_objects)} address objects", end="")
+    if verbose and len(current_address_objects) != 0:
+        plain_console.print(':')
+        plain_console.print('\n'.join(f'\t - {address_object.name}' for address_object in current_address_objects))
 
     # =====================================================================================================
     # Get current address object groups
-    print('Looking for existing address groups...', end='')
+    plain_console.print('Looking for existing address groups...', end='')
     current_address_groups = AddressGroup.refreshall(object_container)
-    print(f'found {len(current_address_groups)} address groups', end='')
-    if settings.VERBOSE_OUTPUT and len(current_address_groups) != 0:
-        print(':')
-        for address_object_group in current_address_groups: print(f'\t - {address_object_group.name}')
+    plain_console.print(f'found {len(current_address_groups)} address groups', end='')
+    if verbose and len(current_address_groups) != 0:
+        plain_console.print(':')
+        plain_console.print('\n'.join(f'\t - {address_object_group.name}' for address_object_group in current_address_groups))
 
     # Create a temporary virtual device group to stage address object creation
     # we're not going to attach it to anything as its only purpose
@@ -74,86 +102,103 @@ def handle_address_objects_and_groups(object_container, panos_device):
     stage_address_objects(staging_dg)
 
     # Now we take objects of different type in this DG and separate them into groups
+    # (a single pass over the children, dispatching each child to the first bucket whose class it's
+    # an instance of - isinstance() makes sure that subclasses of the SDK classes are not dropped)
     staged_address_objects          = []
     staged_address_groups           = []
     staged_dynamic_user_groups      = []
+    buckets = ((AddressObject,      staged_address_objects),
+               (AddressGroup,       staged_address_groups),
+               (DynamicUserGroup,   staged_dynamic_user_groups))
     for child in staging_dg.children:
-         if type(child) is AddressObject:
-             staged_address_objects.append(child)
-         if type(child) is AddressGroup:
-             staged_address_groups.append(child)
-         if type(child) is DynamicUserGroup:
-             staged_dynamic_user_groups.append(child)
+        for cls, bucket in buckets:
+            if isinstance(child, cls):
+                bucket.append(child)
+                break
 
     # =====================================================================================================
     # Cross-reference current address objects with desired objects to establish the delta
     # (redundant, changed and new objects)
-    print('Calculating redundant, modified and new address objects...', end='')
+    plain_console.print('Calculating redundant, modified and new address objects...', end='')
     delta_current_addresses, delta_staged_addresses = find_address_objects_delta(current_address_objects, staged_address_objects)
-    print("done")
+    plain_console.print("done")
 
-    print(f'\tFound: {len(delta_current_addresses)} redundant addresses')
-    print(f'\tFound: {len(delta_staged_addresses)} modified or new addresses')
+    plain_console.print(f'\tFound: {len(delta_current_addresses)} redundant addresses')
+    plain_console.print(f'\tFound: {len(delta_staged_addresses)} modified or new addresses')
 
-    # Output the redundant addresses
-    if settings.VERBOSE_OUTPUT and len(delta_current_addresses) != 0:
-        for address_object in delta_current_addresses:
-            print(f'\t - Redundant address:       {address_object.name}')
+    # Output the redundant addresses (each list is printed in one go rather than line by line)
+    if verbose and len(delta_current_addresses) != 0:
+        plain_console.print('\n'.join(f'\t - Redundant address:       {address_object.name}'
+                                      for address_object in delta_current_addresses))
 
     # Output the updated/new addresses
-    if settings.VERBOSE_OUTPUT and len(delta_staged_addresses) != 0:
-        for address_object in delta_staged_addresses:
-            print(f'\t - Modified or new address: {address_object.name}')
+    if verbose and len(delta_staged_addresses) != 0:
+        plain_console.print('\n'.join(f'\t - Modified or new address: {address_object.name}'
+                                      for address_object in delta_staged_addresses))
 
     # =====================================================================================================
     # Cross-reference current address groups with desired objects to establish the delta
-    print('Calculating redundant, modified or new address groups...', end='')
+    plain_console.print('Calculating redundant, modified or new address groups...', end='')
     delta_current_groups, delta_staged_groups = find_address_groups_delta(current_address_groups, staged_address_groups)
-    print("done")
+    plain_console.print("done")
 
-    print(f'\tFound: {len(delta_current_groups)} redundant groups')
-    print(f'\tFound: {len(delta_staged_groups)} modified or new groups')
+    plain_console.print(f'\tFound: {len(delta_current_groups)} redundant groups')
+    plain_console.print(f'\tFound: {len(delta_staged_groups)} modified or new groups')
 
-    if settings.VERBOSE_OUTPUT and len(delta_current_groups) != 0:
-        for address_group in delta_current_groups:
-            print(f'\t - Redundant group:       {address_group.name}')
+    if verbose and len(delta_current_groups) != 0:
+        plain_console.print('\n'.join(f'\t - Redundant group:       {address_group.name}'
+                                      for address_group in delta_current_groups))
 
     delta_staged_group_names = []
-    if settings.VERBOSE_OUTPUT and len(delta_staged_groups) != 0:
-        for address_group in delta_staged_groups:
-            delta_staged_group_names.append(address_group.name)
-            print(f'\t - Modified or new group: {address_group.name}')
+    if verbose and len(delta_staged_groups) != 0:
+        delta_staged_group_names = [address_group.name for address_group in delta_staged_groups]
+        plain_console.print('\n'.join(f'\t - Modified or new group: {address_group_name}'
+                                      for address_group_name in delta_staged_group_names))
 
     # =====================================================================================================
     # Empty the current address object groups that match names of the delta groups (they somehow changed and
     # need to be recreated)
     # if len(current_address_groups) != 0 and len(delta_staged_group_names) != 0:
-    #     print("Emptying the content of redundant, new or updated groups (so that they can be deleted)...")
+    #     plain_console.print("Emptying the content of redundant, new or updated groups (so that they can be deleted)...")
     #     for group in current_address_groups:
     #         if group.name in delta_staged_group_names:
-    #             print(f"\t - new/updated: {group.name:<64}")
+    #             plain_console.print(f"\t - new/updated: {group.name:<64}")
     #             group.static_value = []
     #             group.update(variable='static_value')
     #     for group in delta_current_groups:
-    #         print(f"\t - redundant: {group.name:<64}")
+    #         plain_console.print(f"\t - redundant: {group.name:<64}")
     #         group.static_value = []
     #         group.update(variable='static_value')
 
+    # =====================================================================================================
+    # NOTE: the four multi-config calls below must be executed sequentially and in this order:
+    #   1. groups are deleted before addresses as PAN-OS refuses to delete an address referenced by a group
+    #   2. addresses are created before groups as a group can only reference existing addresses
+    # Running them concurrently is not an option either - the calls share the same XML API connection
+    # (pan.xapi keeps the state of the last request in the device object) and the first call may be
+    # the one that has to be made in the strict transactional mode.
 
     # =====================================================================================================
     # Delete empty delta and redundant address groups
     if len(current_address_groups) != 0 and len(delta_staged_groups) != 0:
-        print("Staging updated and redundant groups for deletion:")
+        plain_console.print("Staging updated and redundant groups for deletion:")
         action_id = 1
-        multi_config_xml = '<multi-config>'
-        # Here we stage deletion of current groups that were updated
-        for group in set(delta_current_groups + delta_staged_groups):
-            if object_container.find(group.name, AddressGroup):
-                multi_config_xml += f'<delete id="{action_id}" xpath="{object_container.find(group.name, AddressGroup).xpath()}"></delete>'
-                if settings.VERBOSE_OUTPUT: print(f"\tStaged for deletion: {action_id:>6} {group.name:<64}")
-                object_container.remove(object_container.find(group.name, AddressGroup))
+        multi_config_buffer = io.StringIO()
+        multi_config_buffer.write('<multi-config>')
+        # Here we stage deletion of current groups that were updated. The redundant and updated groups are
+        # deduped by name (keeping their order) so that no xpath is staged for deletion twice
+        groups_to_delete = {}
+        for group in chain(delta_current_groups, delta_staged_groups):
+            groups_to_delete.setdefault(group.name, group)
+        for group in groups_to_delete.values():
+            current_group = object_container.find(group.name, AddressGroup)
+            if current_group is not None:
+                multi_config_buffer.write(f'<delete id="{action_id}" xpath="{current_group.xpath()}"></delete>')
+                if verbose: plain_console.print(f"\tStaged for deletion: {action_id:>6} {group.name:<64}")
+                object_container.remove(current_group)
             action_id += 1
-        multi_config_xml += '</multi-config>'
+        multi_config_buffer.write('</multi-config>')
+        multi_config_xml = multi_config_buffer.getvalue()
         # Now we delete all groups staged for deletion
         execute_multi_config_api_call(panos_device, multi_config_xml, "Performing the staged operation(s)...", 0)
 
@@ -161,52 +206,59 @@ def handle_address_objects_and_groups(object_container, panos_device):
     # =====================================================================================================
     # Delete delta and redundant addresses from the current config:
     if len(current_address_objects) != 0:
-        print("Staging the updated and redundant addresses for deletion:")
+        plain_console.print("Staging the updated and redundant addresses for deletion:")
         action_id = 1
-        multi_config_xml = '<multi-config>'
+        multi_config_buffer = io.StringIO()
+        multi_config_buffer.write('<multi-config>')
         for address in delta_current_addresses:
-            multi_config_xml += f'<delete id="{action_id}" xpath="{address.xpath()}"></delete>'
-            if settings.VERBOSE_OUTPUT: print(f"\tStaged for deletion: {action_id:>6} - {address.name:<64}")
+            multi_config_buffer.write(f'<delete id="{action_id}" xpath="{address.xpath()}"></delete>')
+            if verbose: plain_console.print(f"\tStaged for deletion: {action_id:>6} - {address.name:<64}")
             object_container.remove(address)
             action_id += 1
+        # The staged addresses are not part of the config tree, so their XPath is derived directly
+        # from the XPath of the container (instead of temporarily adding them to the container)
+        container_xpath = object_container.xpath()
         for address in delta_staged_addresses:
-            object_container.add(address) # we temporarily add the staged address to the config tree so that
-                            # calculation of the XPath worked at the next step
-            multi_config_xml += f'<delete id="{action_id}" xpath="{address.xpath()}"></delete>'
-            if settings.VERBOSE_OUTPUT: print(f"\tStaged for deletion: {action_id:>6} - {address.name:<64}")
-            object_container.remove(address)
+            address_xpath = f"{container_xpath}/address/entry[@name='{address.name}']"
+            multi_config_buffer.write(f'<delete id="{action_id}" xpath="{address_xpath}"></delete>')
+            if verbose: plain_console.print(f"\tStaged for deletion: {action_id:>6} - {address.name:<64}")
             action_id += 1
-        multi_config_xml += '</multi-config>'
+        multi_config_buffer.write('</multi-config>')
+        multi_config_xml = multi_config_buffer.getvalue()
         # Now we delete all address objects staged for deletion
-        execute_multi_config_api_call(panos_device, multi_config_xml, "Performing the staged operation(s)...", 0)
+        execute_multi_config_api_call(panos_device, multi_config_xml, "Performing the staged operation(s)...", 0, num_operations=action_id - 1)
 
     # =====================================================================================================
     # (Re)create the delta address objects
     if len(delta_staged_addresses) != 0:
-        print("Staging the updated address objects for creation:")
+        plain_console.print("Staging the updated address objects for creation:")
         action_id = 1
-        multi_config_xml = '<multi-config>'
+        multi_config_buffer = io.StringIO()
+        multi_config_buffer.write('<multi-config>')
         for address in delta_staged_addresses:
             object_container.add(address)
-            if settings.VERBOSE_OUTPUT: print(f"\tStaged for creation: {action_id:>6} - {address.name:<64}")
-            multi_config_xml += f'<edit id="{action_id}" xpath="{address.xpath()}">{address.element_str().decode()}</edit>'
+            if verbose: plain_console.print(f"\tStaged for creation: {action_id:>6} - {address.name:<64}")
+            multi_config_buffer.write(f'<edit id="{action_id}" xpath="{address.xpath()}">{address.element_str().decode()}</edit>')
             action_id += 1
-        multi_config_xml += '</multi-config>'
-        execute_multi_config_api_call(panos_device, multi_config_xml, "Performing the staged operation(s)...", 0)
+        multi_config_buffer.write('</multi-config>')
+        multi_config_xml = multi_config_buffer.getvalue()
+        execute_multi_config_api_call(panos_device, multi_config_xml, "Performing the staged operation(s)...", 0, num_operations=action_id - 1)
 
     # =====================================================================================================
     # (Re)create the delta address groups
     if len(delta_staged_groups) != 0:
-        print("Staging the updated/new address groups for creation:")
+        plain_console.print("Staging the updated/new address groups for creation:")
         action_id = 1
-        multi_config_xml = '<multi-config>'
+        multi_config_buffer = io.StringIO()
+        multi_config_buffer.write('<multi-config>')
         for group in delta_staged_groups:
             object_container.add(group)
-            if settings.VERBOSE_OUTPUT: print(f"\tStaged for creation: {action_id:>6} - {group.name:<64}")
-            multi_config_xml += f'<edit id="{action_id}" xpath="{group.xpath()}">{group.element_str().decode()}</edit>'
+            if verbose: plain_console.print(f"\tStaged for creation: {action_id:>6} - {group.name:<64}")
+            multi_config_buffer.write(f'<edit id="{action_id}" xpath="{group.xpath()}">{group.element_str().decode()}</edit>')
             action_id += 1
-        multi_config_xml += '</multi-config>'
-        execute_multi_config_api_call(panos_device, multi_config_xml, "Performing the staged operation(s)...", 0)
+        multi_config_buffer.write('</multi-config>')
+        multi_config_xml = multi_config_buffer.getvalue()
+        execute_multi_config_api_call(panos_device, multi_config_xml, "Performing the staged operation(s)...", 0, num_operations=action_id - 1)
 
 
 def stage_address_objects(staging_dg):
@@ -219,65 +271,58 @@ def stage_address_objects(staging_dg):
     Args:
         staging_dg (DeviceGroup): Device Group instance where address objects and groups will be staged.
     """
-    print("Pre-staging all address objects and groups...")
+    plain_console.print("Pre-staging all address objects and groups...")
 
     # ########################################################################################################
     # Address objects for Git over SSH to GitHub (we are retrieving up-to-date addresses from GitHub)
     # ########################################################################################################
-    print(f'\tRetrieving current GitHub Git-over-SSH addresses...', end='')
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    response = requests.get('https://api.github.com/meta', verify=settings.CERTIFICATE_BUNDLE_FILENAME)
-    data = response.json()
-    git_section = data['git']
-    ipv4_ips = [ip for ip in git_section if ':' not in ip]
-    ip_names_github = list()
-    for ip in ipv4_ips:
-        ip_name = 'H-github-' + ip.replace('/', '_')
-        ip_names_github.append(ip_name)
-        staging_dg.add(AddressObject(name=ip_name, type='ip-netmask', value=ip,
-                                     description='GitHub Address/Subnet used for Git'))
-    print(f'{len(ip_names_github)} address(es) found.')
+    plain_console.print(f'\tRetrieving current GitHub Git-over-SSH addresses...', end='')
+    data = get_github_meta()
+    # Only IPv4 addresses/subnets are used (IPv6 ones contain a colon)
+    github_address_objects = [AddressObject(name='H-github-' + ip.replace('/', '_'), type='ip-netmask', value=ip,
+                                            description='GitHub Address/Subnet used for Git')
+                              for ip in data['git'] if ':' not in ip]
+    ip_names_github = [address.name for address in github_address_objects]
+    staging_dg.extend(github_address_objects)
+    plain_console.print(f'{len(ip_names_github)} address(es) found.')
 
     ###########################################################################################################
     # Creating all address objects from CSV
     # Import static objects from a spreadsheet
-    address_objects = parse_metadata_from_csv("Address Objects", settings.ADDRESS_OBJECTS_FILENAME)
+    # Each row is normalized (fields stripped) once here, so the passes below work with plain attributes
+    # (only the columns used below are read from the file)
+    address_objects = [AddressEntry(name=row.name.strip(),
+                                    type=row.type,
+                                    value=row.value.strip(),
+                                    tags=row.tags,
+                                    description=row.description.strip(),
+                                    group_name=(row.group_name or '').strip(),
+                                    group_description=(row.group_description or '').strip())
+                       for row in parse_metadata_from_csv("Address Objects", settings.ADDRESS_OBJECTS_FILENAME,
+                                                          columns=ADDRESS_OBJECTS_COLUMNS)]
 
     # Now we parse all address objects from the CSV looking for ones with empty Tags field
     # Tagged and non-tagged objects cannot be mixed up in one bulk object creation operation
-    count = 0
+    csv_address_objects = []
     for address in address_objects:
-        if address['Type'] != 'Static group':
+        if address.type != 'Static group':
             # Convert human-readable types from the CSV file to exact API keywords
-            if address['Type'] == 'IP Wildcard':
-                address_type = 'ip-wildcard'
-            elif address['Type'] == 'IP Range':
-                address_type = 'ip-range'
-            elif address['Type'] == 'FQDN':
-                address_type = 'fqdn'
-            else:
-                address_type = 'ip-netmask' # default value
+            address_type = ADDRESS_TYPES.get(address.type, 'ip-netmask')  # 'ip-netmask' is the default value
 
-            # convert the Tags field to a list or set to None if it's an empty string
-            normalized_tags = address['Tags']
-            if normalized_tags == '': normalized_tags = None
-            else:
-                # Tags are converted into a list
-                normalized_tags = normalized_tags.split(';')
-                # We also strip leading and trailing spaces from each of them
-                normalized_tags = [x.strip(' ') for x in normalized_tags]
+            # convert the Tags field to a list (stripping leading and trailing spaces from each tag)
+            # or set it to None if it's an empty string
+            normalized_tags = [tag.strip() for tag in address.tags.split(';')] if address.tags else None
 
             # set the Description to None if it's an empty string
-            normalized_description = address['Description'].strip()
-            if normalized_description == '': normalized_description = None
+            normalized_description = address.description or None
 
-            # We add each found object to the target device group/firewall
-            staging_dg.add(AddressObject(name=address['Name'].strip(),
-                                         type=address_type,
-                                         value=address['Address'].strip(),
-                                         description=normalized_description,
-                                         tag=normalized_tags))
-            count += 1
+            # We collect each found object to add them to the target device group/firewall in one go
+            csv_address_objects.append(AddressObject(name=address.name,
+                                                     type=address_type,
+                                                     value=address.value,
+                                                     description=normalized_description,
+                                                     tag=normalized_tags))
+    staging_dg.extend(csv_address_objects)
 
 
     staging_dg.add(AddressGroup(name='AG-github_git', static_value=ip_names_github, description='This group contains all addresses declared by GitHub as the '
@@ -285,101 +330,158 @@ def stage_address_objects(staging_dg):
 
     # Updating the list of DCs if required
     if settings.UPDATE_AD_DC_LIST:
-        print(f'\tRetrieving the current list of AD Domain Controllers and creating address objects accordingly...', end='')
+        # dnspython is only needed when the list of DCs is updated, so it's imported on demand
+        import dns.resolver
+
+        plain_console.print(f'\tRetrieving the current list of AD Domain Controllers and creating address objects accordingly...', end='')
         dc_dict   = {}
-        answers   = dns.resolver.resolve('_ldap._tcp.dc._msdcs.' + settings.AD_DOMAIN_NAME_DNS, 'SRV')
-        for rdata in answers:
-            # Split the FQDN to extract the hostname (remove the domain name)
-            dc_name = rdata.target.to_text(omit_final_dot=True).split('.')[0]
+        # Settings used inside the loops below are read once
+        ad_domain_name_dns  = settings.AD_DOMAIN_NAME_DNS
+        dc_description      = f"Domain Controller for '{settings.AD_DOMAIN_NAME}'"
+        ad_dc_tag           = tags["ad-dc"]["name"]
+
+        answers   = dns.resolver.resolve('_ldap._tcp.dc._msdcs.' + ad_domain_name_dns, 'SRV')
+        # Split the FQDN to extract the hostname (remove the domain name)
+        dc_names  = [rdata.target.to_text(omit_final_dot=True).split('.')[0] for rdata in answers]
+
+        def resolve_dc_address(dc_name):
             # Query DNS for the A record of the domain controller
-            ip_answers = dns.resolver.resolve(dc_name + '.' + settings.AD_DOMAIN_NAME_DNS, 'A')
+            return dc_name, dns.resolver.resolve(dc_name + '.' + ad_domain_name_dns, 'A')
+
+        # The A-record lookups are independent network round-trips, so we run them concurrently
+        # (results are returned in the order of the SRV answers)
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            dc_answers = list(executor.map(resolve_dc_address, dc_names))
+
+        for dc_name, ip_answers in dc_answers:
             for ip_rdata in ip_answers:
                 dc_ip = ip_rdata.to_text()
                 key = 'H-' + dc_name + '-' + dc_ip + '_32'
                 value = dc_ip + '/32'
                 dc_dict[key] = value
-        print(f'{len(dc_dict)} DCs found; creating address objects...', end='')
-        for key, value in dc_dict.items():
-            staging_dg.add(AddressObject(tag=[settings.tag_ad_dc], name=key, type='ip-netmask',
-                                         value=value, description=f"Domain Controller for '{settings.AD_DOMAIN_NAME}'"))
-        print('done')
+        plain_console.print(f'{len(dc_dict)} DCs found; creating address objects...', end='')
+        # (extend() iterates its argument twice, so it must be given a list, not a generator)
+        staging_dg.extend([AddressObject(tag=[ad_dc_tag], name=key, type='ip-netmask',
+                                         value=value, description=dc_description)
+                           for key, value in dc_dict.items()])
+        plain_console.print('done')
 
     # Creating Dynamic Address groups:
-    print(f'\tDynamic Address Groups...', end='')
-    staging_dg.add(AddressGroup(name='DAG-domain-controllers',
-                                description='This dynamic group contains all AD Domain Controllers',
-                                dynamic_value=f"'{tags["ad-dc"]["name"]}'"))
-
-    staging_dg.add(AddressGroup(name='DAG-compromised_hosts',
-                                description='This dynamic address group contains allegedly compromised hosts '
-                                                         '- the ones that attempted to reach a C&C destination.',
-                                dynamic_value=f"'{tags["compromised-host"]["name"]}'"))
-
-    staging_dg.add(AddressGroup(name='DAG-tls_d_auto_exceptions',
-                                description='TLS-connections to these IP-addresses had been attempted to be decrypted but failed',
-                                dynamic_value=f"'{tags["tls-d-exceptions-auto"]["name"]}'"))
-    print('done')
+    plain_console.print(f'\tDynamic Address Groups...', end='')
+    # Each dynamic group is described by its name, description and the key of the tag it matches on
+    dynamic_address_groups = (
+        ('DAG-domain-controllers',
+         'This dynamic group contains all AD Domain Controllers',
+         'ad-dc'),
+        ('DAG-compromised_hosts',
+         'This dynamic address group contains allegedly compromised hosts '
+         '- the ones that attempted to reach a C&C destination.',
+         'compromised-host'),
+        ('DAG-tls_d_auto_exceptions',
+         'TLS-connections to these IP-addresses had been attempted to be decrypted but failed',
+         'tls-d-exceptions-auto'),
+    )
+    for group_name, group_description, tag_key in dynamic_address_groups:
+        tag_name = tags[tag_key]["name"]
+        staging_dg.add(AddressGroup(name=group_name,
+                                    description=group_description,
+                                    dynamic_value=f"'{tag_name}'"))
+    plain_console.print('done')
 
     # Creating Dynamic User groups:
-    print(f'\tDynamic User Groups...', end='')
+    plain_console.print(f'\tDynamic User Groups...', end='')
+    compromised_user_tag = tags["compromised-user"]["name"]
     staging_dg.add(DynamicUserGroup(name='DUG-compromised_users',
                                     description='This dynamic user group contains allegedly compromised users '
                                                              '- the ones that attempted to reach a C&C destination.',
-                                    filter=f"'{tags["compromised-user"]["name"]}'",
-                                    tag=[tags["compromised-user"]["name"]]))
-    print('done')
+                                    filter=f"'{compromised_user_tag}'",
+                                    tag=[compromised_user_tag]))
+    plain_console.print('done')
 
     # =================================================================================
     # Creating static groups:
-    print(f'\tStatic address object groups...', end='')
-    # First of all we begin with building a list of all address object groups
-    all_referenced_groups = []
+    plain_console.print(f'\tStatic address object groups...', end='')
+    # First of all we index all CSV entries by the name of the group they belong to. This is done in a single
+    # pass over the entries - the dictionary keys keep the order in which the groups first appear in the CSV
+    # and dedupe the group names at the same time. Groups that are members of other groups (Static Group entries)
+    # are indexed separately as they have to be created after the groups they reference.
+    members_by_group            = defaultdict(list)
+    description_by_group        = {}
+    nested_members_by_group     = defaultdict(list)
+    nested_description_by_group = {}
     for entry in address_objects:
-        if entry['Group Name'] is not None and entry['Group Name'] != '' and entry['Type'] != 'Static Group':
-            if entry['Group Name'].startswith('AG-'):
-                all_referenced_groups.append(entry['Group Name'])
+        group_name = entry.group_name
+        if group_name == '':
+            continue
+        if entry.type != 'Static Group':
+            if group_name.startswith('AG-'):
+                members_by_group[group_name].append(entry.name)
+                if entry.group_description != '':
+                    description_by_group[group_name] = entry.group_description
+            else:
+                plain_console.print(f'Found a group with incorrect group name: {group_name}. This group will not be created.')
+        else:
+            if group_name.startswith('AG-'):
+                nested_members_by_group[group_name].append(entry.name)
+                if entry.group_description != '':
+                    nested_description_by_group[group_name] = entry.group_description
             else:
-                print(f'Found a group with incorrect group name: {entry["Group Name"]}. This group will not be created.')
-
-    # Dedupe the list of address object groups
-    all_referenced_groups = list(dict.fromkeys(all_referenced_groups))
-    print(f'{len(all_referenced_groups)} groups found...', end='')
-
-    # Now we create each of the address object groups
-    for group in all_referenced_groups:
-        group_members     = []
-        group_description = ''
-        for entry in address_objects:
-            if entry['Type'] != 'Static Group' and entry['Group Name'] == group:
-                group_members.append(entry['Name'].strip())
-                if entry['Group Description'] != '':
-                    group_description = entry['Group Description'].strip()
-        # Now we add the group object to the device group
-        normalized_description = group_description if group_description != '' else None
-        staging_dg.add(AddressGroup(name=group.strip(), static_value=group_members, description=normalized_description))
+                plain_console.print(f'\tFound a group with incorrect group name: {group_name}. This group will not be created.')
+
+    plain_console.print(f'{len(members_by_group)} groups found...', end='')
+
+    # Now we create each of the address object groups and add them to the device group
+    staging_dg.extend([AddressGroup(name=group, static_value=group_members,
+                                    description=description_by_group.get(group) or None)
+                       for group, group_members in members_by_group.items()])
 
     # ==============================================================================
-    # Now we look for groups that are members of other groups
-    all_referenced_groups = []
-    for entry in address_objects:
-        if entry['Group Name'] != '' and entry['Type'] == 'Static Group':
-            if entry['Group Name'].startswith('AG-'):
-                all_referenced_groups.append(entry['Group Name'])
-            else:
-                print(f'\tFound a group with incorrect group name: {entry["Group Name"]}. This group will not be created.')
-    # Dedupe the list of address object groups
-    all_referenced_groups = list(dict.fromkeys(all_referenced_groups))
-
-    # Now we create each of the address object groups
-    for group in all_referenced_groups:
-        group_members     = []
-        group_description = ''
-        for entry in address_objects:
-            if entry['Type'] == 'Static Group' and entry['Group Name'] == group:
-                group_members.append(entry['Name'])
-                if entry['Group Description'] != '':
-                    group_description = entry['Group Description']
-        # Now we add the group object to the device group
-        normalized_description = group_description if group_description != '' else None
-        staging_dg.add(AddressGroup(name=group, static_value=group_members, description=normalized_description))
-    print("")
+    # Now we create the groups that are members of other groups
+    staging_dg.extend([AddressGroup(name=group, static_value=group_members,
+                                    description=nested_description_by_group.get(group) or None)
+                       for group, group_members in nested_members_by_group.items()])
+    plain_console.print("")
+
+
+def get_github_meta():
+    """
+    Retrieves the GitHub meta information (https://api.github.com/meta), which contains the addresses
+    used by GitHub services (such as Git over SSH).
+
+    The response is cached on disk together with its ETag (in the file defined by the
+    `GITHUB_META_CACHE_FILENAME` setting). Subsequent calls send the ETag in the `If-None-Match`
+    header and reuse the cached data if GitHub responds with `304 Not Modified`.
+
+    Returns:
+        dict: The parsed GitHub meta information.
+    """
+    # The HTTP stack is imported on demand as it's relatively slow to import and only needed here
+    import requests
+    import urllib3
+
+    cached_meta = None
+    headers = {}
+    if os.path.isfile(settings.GITHUB_META_CACHE_FILENAME):
+        try:
+            with open(settings.GITHUB_META_CACHE_FILENAME, mode='r', encoding='utf-8') as cache_file:
+                cached_meta = json.load(cache_file)
+            headers['If-None-Match'] = cached_meta['etag']
+        except (json.JSONDecodeError, KeyError, TypeError, OSError):
+            # A corrupted cache is simply ignored (the data will be downloaded again)
+            cached_meta = None
+
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    response = requests.get('https://api.github.com/meta', headers=headers, verify=settings.CERTIFICATE_BUNDLE_FILENAME)
+
+    if response.status_code == 304 and cached_meta is not None:
+        return cached_meta['data']
+
+    data = response.json()
+    etag = response.headers.get('ETag')
+    if response.ok and etag:
+        try:
+            with open(settings.GITHUB_META_CACHE_FILENAME, mode='w', encoding='utf-8') as cache_file:
+                json.dump({'etag': etag, 'data': data}, cache_file)
+        except OSError as e:
+            plain_console.print(f"Failed to cache the GitHub meta information in '{settings.GITHUB_META_CACHE_FILENAME}': {e}")
+    return data
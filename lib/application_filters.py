@@ -7,15 +7,43 @@ It handles filtering applications by subcategory, category, tags, and risk
 levels, and supports excluding specific applications from filters.
 """
 
+import xml.etree.ElementTree as ET
 from panos.objects import ApplicationFilter
 from ngfw.objects.tags.tags import tags
-from lib.auxiliary_functions import execute_multi_config_api_call
 import settings
 from rich import print
 from rich.console import Console
 from rich.table import Table
 
 
+# Risk-based application filters: (filter name suffix, risk level, risk level label)
+RISK_FILTERS = (
+    ('very-high-risk',  '5', '5 (Very High)'),
+    ('high-risk',       '4', '4 (High)'),
+    ('medium-risk',     '3', '3 (Medium)'),
+    ('low-risk',        '2', '2 (Low)'),
+    ('very-low-risk',   '1', '1 (Very Low)'),
+)
+
+
+def print_staging_table(console, title, columns, rows):
+    """
+    Renders a summary table of staged application filters.
+
+    Args:
+        console: Rich console to print the table to.
+        title (str): Title of the table.
+        columns: Sequence of (column header, column style) tuples.
+        rows: Sequence of row tuples (one value per column).
+    """
+    table = Table(title=title)
+    for header, style in columns:
+        table.add_column(header, style=style)
+    for row in rows:
+        table.add_row(*row)
+    console.print(table)
+
+
 def create_application_filters(target, panos_device, app_categories):
     """
     Stages application filters based on the business requirements for
@@ -29,15 +57,14 @@ def create_application_filters(target, panos_device, app_categories):
     Args:
         panos_device: Firewall or Panorama device object.
         target: Device Group or VSYS object where the application filters will be created
-        app_categories: List of application category dictionaries. Each
-            dictionary specifies 'Action', 'SubCategory', 'Category', 'Tags',
-            'Risk', and 'ExcludedApps' associated with the application
-            category. The 'Action' field defines how to handle the category,
-            such as manage, do not manage (alert), or deny.
+        app_categories: List of AppCategory tuples (see normalize_app_categories()
+            in lib/category_parser.py). The 'action' field defines how to handle
+            the category, such as manage, do not manage (alert), or deny.
 
     Returns:
-        str: A Multi-Config Element XML string representing all the staged
-        application filters.
+        list: (xpath, element XML) tuples of all staged application filters.
+        They are sent to the device by create_application_filters_and_groups()
+        together with the application groups.
     """
     panos_device.add(target)
     # ===========================================================================================
@@ -45,149 +72,100 @@ def create_application_filters(target, panos_device, app_categories):
     console = Console()
     console.print("Staging application filters for managed and non-managed app categories:")
 
-    # Create a table for application categories
-    table = Table(title="Application Filters for Categories")
-    table.add_column("SubCategory", style="cyan")
-    table.add_column("Action", style="magenta")
-    table.add_column("Filter Name", style="green")
-    table.add_column("Status", style="yellow")
+    # Rows of the summary tables are collected as plain tuples.
+    # The tables themselves are rendered only in verbose mode (rich table layout is not free for large category lists)
+    category_rows   = []
+    risk_rows       = []
+    legacy_rows     = []
+
+    # Settings used inside the loop are read once
+    prefix          = settings.PREFIX_FOR_APPLICATION_FILTERS
+    action_manage   = settings.APP_ACTION_MANAGE
+    action_alert    = settings.APP_ACTION_ALERT
+    action_deny     = settings.APP_ACTION_DENY
 
+    # Filters are tracked as they are staged (the target may hold other objects)
+    staged_filters = []
     managed_categories = []
     categories_with_excluded_apps = {}
     for category in app_categories:
-        if category["Action"].lower() == settings.APP_ACTION_ALERT:
-            managed_categories.append(category["Category"].lower())
-
-        if category["Action"].lower() == settings.APP_ACTION_MANAGE or category["Action"].lower() == settings.APP_ACTION_ALERT:
-
-            apf_subcategory = category["SubCategory"].lower()
-            apf_name        = settings.PREFIX_FOR_APPLICATION_FILTERS + apf_subcategory
-            apf_name_all    = settings.PREFIX_FOR_APPLICATION_FILTERS + apf_subcategory + '-all'
-
-            list_of_categories = category["Category"].lower().split(',')
-            list_of_categories = [x.strip(' ') for x in list_of_categories]
-            apf_category = None if list_of_categories == [''] else list_of_categories
+        action = category.action
+        if action == action_manage or action == action_alert:
+            if action == action_alert:
+                managed_categories.append(category.categories)
 
-            list_of_tags = category["Tags"].split(',')
-            list_of_tags = [x.strip(' ') for x in list_of_tags]
-            apf_tags = None if list_of_tags == [''] else list_of_tags
-
-            list_of_risks = category["Risk"].split(',')
-            list_of_risks = [x.strip(' ') for x in list_of_risks]
-            apf_risks = None if list_of_risks == [''] else list_of_risks
-
-            list_of_excluded = category["ExcludedApps"].split(',')
-            list_of_excluded = [x.strip(' ') for x in list_of_excluded]
-            apf_excluded = None if list_of_excluded == [''] else list_of_excluded
+            apf_subcategory = category.subcategory
+            apf_name        = f'{prefix}{apf_subcategory}'
+            apf_name_all    = f'{prefix}{apf_subcategory}-all'
 
             # if there are any excluded apps for this subcategory
             # then we take a note of them in a special dictionary
-            if apf_excluded:
-                categories_with_excluded_apps.update({apf_name: apf_excluded})
+            if category.excluded_apps:
+                categories_with_excluded_apps.update({apf_name: category.excluded_apps})
 
             # Stage the custom application filter
-            target.add(ApplicationFilter(name=apf_name,
-                                         subcategory=apf_subcategory,
-                                         category=apf_category,
-                                         tag=apf_tags,
-                                         risk=apf_risks))
+            staged_filters.append(target.add(ApplicationFilter(name=apf_name,
+                                                               subcategory=apf_subcategory,
+                                                               category=category.categories,
+                                                               tag=category.tags,
+                                                               risk=category.risks)))
 
             # Stage a generic application filter
-            target.add(ApplicationFilter(name=apf_name_all, subcategory=apf_subcategory))
-
-            table.add_row(
-                category["SubCategory"],
-                category["Action"].upper(),
-                apf_name,
-                "Staged (used for access control)"
-            )
-
-            table.add_row(
-                category["SubCategory"],
-                category["Action"].upper(),
-                apf_name_all,
-                "Staged (used to block non-sanctioned apps)"
-            )
-
-        elif category["Action"].lower() == settings.APP_ACTION_DENY:
-            table.add_row(
-                category["SubCategory"],
-                category["Action"].upper(),
-                "N/A",
-                "Filter not required (blocked category)"
-            )
+            staged_filters.append(target.add(ApplicationFilter(name=apf_name_all, subcategory=apf_subcategory)))
+
+            category_rows.append((category.name, category.action_label.upper(), apf_name,
+                                  "Staged (used for access control)"))
+            category_rows.append((category.name, category.action_label.upper(), apf_name_all,
+                                  "Staged (used to block non-sanctioned apps)"))
+
+        elif action == action_deny:
+            category_rows.append((category.name, category.action_label.upper(), "N/A",
+                                  "Filter not required (blocked category)"))
         else:
-            table.add_row(
-                category["SubCategory"],
-                category["Action"],
-                "N/A",
-                "Unknown value in Action field - skipping filter creation"
-            )
-
-    # Display the table
-    console.print(table)
+            category_rows.append((category.name, category.action_label, "N/A",
+                                  "Unknown value in Action field - skipping filter creation"))
 
     # print("\t\tApplication filters - filter for globally sanctioned managed and unmanaged apps")
     # target_dg.add(ApplicationFilter(name=f'{settings.PREFIX_FOR_APPLICATION_FILTERS}sanctioned-managed-apps',
     #                                 subcategory=managed_categories, tag=['{tags["sanctioned-apps"]["name"]}'])).apply()
 
-    # Create a table for risk-based filters
-    risk_table = Table(title="Risk-Based Application Filters")
-    risk_table.add_column("Filter Name", style="green")
-    risk_table.add_column("Risk Level", style="red")
-    risk_table.add_column("Status", style="yellow")
-
     # Add risk-based filters (effectively, they will cover applications from blocked categories)
-    target.add(ApplicationFilter(name=f'{settings.PREFIX_FOR_APPLICATION_FILTERS}very-high-risk', risk=['5']))
-    risk_table.add_row(f'{settings.PREFIX_FOR_APPLICATION_FILTERS}very-high-risk', '5 (Very High)', 'Staged')
-
-    target.add(ApplicationFilter(name=f'{settings.PREFIX_FOR_APPLICATION_FILTERS}high-risk', risk=['4']))
-    risk_table.add_row(f'{settings.PREFIX_FOR_APPLICATION_FILTERS}high-risk', '4 (High)', 'Staged')
-
-    target.add(ApplicationFilter(name=f'{settings.PREFIX_FOR_APPLICATION_FILTERS}medium-risk', risk=['3']))
-    risk_table.add_row(f'{settings.PREFIX_FOR_APPLICATION_FILTERS}medium-risk', '3 (Medium)', 'Staged')
-
-    target.add(ApplicationFilter(name=f'{settings.PREFIX_FOR_APPLICATION_FILTERS}low-risk', risk=['2']))
-    risk_table.add_row(f'{settings.PREFIX_FOR_APPLICATION_FILTERS}low-risk', '2 (Low)', 'Staged')
-
-    target.add(ApplicationFilter(name=f'{settings.PREFIX_FOR_APPLICATION_FILTERS}very-low-risk', risk=['1']))
-    risk_table.add_row(f'{settings.PREFIX_FOR_APPLICATION_FILTERS}very-low-risk', '1 (Very Low)', 'Staged')
-
-    # Display the risk table
-    console.print(risk_table)
-
-    # Create a table for legacy custom apps
-    legacy_table = Table(title="Legacy Custom Applications Filter")
-    legacy_table.add_column("Filter Name", style="green")
-    legacy_table.add_column("Tag", style="blue")
-    legacy_table.add_column("Status", style="yellow")
+    for name_suffix, risk, risk_label in RISK_FILTERS:
+        apf_name = f'{prefix}{name_suffix}'
+        staged_filters.append(target.add(ApplicationFilter(name=apf_name, risk=[risk])))
+        risk_rows.append((apf_name, risk_label, 'Staged'))
 
     # Add legacy custom apps filter
-    target.add(ApplicationFilter(name=f'{settings.PREFIX_FOR_APPLICATION_FILTERS}custom-apps-legacy',
-                                 tag=[f'{tags["legacy-custom-apps"]["name"]}']))
-    legacy_table.add_row(
-        f'{settings.PREFIX_FOR_APPLICATION_FILTERS}custom-apps-legacy',
-        tags["legacy-custom-apps"]["name"],
-        'Staged'
-    )
-
-    # Display the legacy table
-    console.print(legacy_table)
-
-    # Now we create Multi-Config Element XML for all staged app filters
-    action_id = 1
-    multi_config_xml = '<multi-config>'
-    for app_filter in target.findall(ApplicationFilter):
-        if "None" not in app_filter.xpath():
-            # If the category had excluded apps then we add XML code for this
-            if app_filter.name in categories_with_excluded_apps.keys():
-                excluded_apps_xml = "<exclude>" + "".join(f"<member>{app}</member>" for app in categories_with_excluded_apps[app_filter.name]) + "</exclude></entry>"
-                element = app_filter.element_str().decode().replace("</entry>", excluded_apps_xml)
-            else:
-                element = app_filter.element_str().decode()
-            multi_config_xml += f'<edit id="{action_id}" xpath="{app_filter.xpath()}">{element}</edit>'
-            action_id += 1
-    multi_config_xml += '</multi-config>'
-
-    # Finally, we execute the Multi-Config API call thus creating all app filters in one go
-    execute_multi_config_api_call(panos_device, multi_config_xml, "Creating the staged application filters...", 0)
+    apf_name = f'{prefix}custom-apps-legacy'
+    legacy_custom_apps_tag = tags["legacy-custom-apps"]["name"]
+    staged_filters.append(target.add(ApplicationFilter(name=apf_name, tag=[legacy_custom_apps_tag])))
+    legacy_rows.append((apf_name, legacy_custom_apps_tag, 'Staged'))
+
+    # Display the tables
+    if settings.VERBOSE_OUTPUT:
+        print_staging_table(console, "Application Filters for Categories",
+                            (("SubCategory", "cyan"), ("Action", "magenta"), ("Filter Name", "green"), ("Status", "yellow")),
+                            category_rows)
+        print_staging_table(console, "Risk-Based Application Filters",
+                            (("Filter Name", "green"), ("Risk Level", "red"), ("Status", "yellow")),
+                            risk_rows)
+        print_staging_table(console, "Legacy Custom Applications Filter",
+                            (("Filter Name", "green"), ("Tag", "blue"), ("Status", "yellow")),
+                            legacy_rows)
+    else:
+        console.print(f"{len(staged_filters)} application filters staged")
+
+    # Now we collect xpath and element XML of all staged app filters for the Multi-Config API call
+    staged_edits = []
+    for app_filter in staged_filters:
+        element = app_filter.element()
+        # If the category had excluded apps then we add the <exclude> node to the filter element
+        # (the SDK has no parameter for it)
+        excluded_apps = categories_with_excluded_apps.get(app_filter.name)
+        if excluded_apps:
+            exclude_node = ET.SubElement(element, 'exclude')
+            for app in excluded_apps:
+                ET.SubElement(exclude_node, 'member').text = app
+        staged_edits.append((app_filter.xpath(), ET.tostring(element, encoding='unicode')))
+
+    return staged_edits
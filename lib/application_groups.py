@@ -10,36 +10,55 @@ non-managed applications.
 
 import sys
 from panos.objects import ApplicationGroup
+from lib.application_filters import create_application_filters
 from lib.auxiliary_functions import parse_metadata_from_json
 from lib.auxiliary_functions import execute_multi_config_api_call
+from lib.category_parser import normalize_app_categories
 import settings
 from rich import print
 
 
 def create_application_groups(target, panos_device, app_categories):
+    """
+    Stages application groups for managed and non-managed application categories
+    (the application filter of the category plus its optional extra apps),
+    the 'APG-non-managed-apps' group and the groups defined in the JSON file.
+
+    Args:
+        target: Device Group or VSYS object where the application groups will be created.
+        panos_device: Firewall or Panorama device object.
+        app_categories: List of AppCategory tuples (see normalize_app_categories() in lib/category_parser.py).
+
+    Returns:
+        list: (xpath, element XML) tuples of all staged application groups.
+    """
     # Creation of Application Filters that need to be either managed or non-managed (yet allowed)
     print(f'Staging application groups for managed and non-managed app categories to account for optional '
           f'extra apps...', end='')
+    # Settings used inside the loop are read once
+    prefix          = settings.PREFIX_FOR_APPLICATION_FILTERS
+    action_manage   = settings.APP_ACTION_MANAGE
+    action_alert    = settings.APP_ACTION_ALERT
+
+    # Groups of non-managed categories are collected in the same pass for the 'APG-non-managed-apps' group
+    groups_for_non_managed_cats = list()
+    # Groups are tracked as they are staged (the target may hold other objects)
+    staged_groups = []
     for category in app_categories:
-        if (category["Action"].lower() == settings.APP_ACTION_MANAGE or
-                category["Action"].lower() == settings.APP_ACTION_ALERT):
-            apps = list()
-            if category["ExtraApps"] != '':
-                apps = category["ExtraApps"].split(',')
-            app_filter = settings.PREFIX_FOR_APPLICATION_FILTERS + category["SubCategory"].lower()
+        action = category.action
+        if action == action_manage or action == action_alert:
+            app_group_name = f'APG-{category.subcategory}'
+            app_filter = f'{prefix}{category.subcategory}'
             members = [app_filter]
-            if len(apps) > 0:  # if the list of apps is not empty - strip spaces from all entries
-                for i, s in enumerate(apps):
-                    apps[i] = s.strip()
-            members.extend(apps)  # add the list of apps to the application filter for them all to become application group members
-            target.add(ApplicationGroup(name='APG-' + category["SubCategory"].lower(), value=members))
+            # add the optional extra apps to the application filter for them all to become application group members
+            if category.extra_apps:
+                members.extend(category.extra_apps)
+            staged_groups.append(target.add(ApplicationGroup(name=app_group_name, value=members)))
+            if action == action_alert:
+                groups_for_non_managed_cats.append(app_group_name)
 
     # Group for all non-managed apps
-    groups_for_non_managed_cats = list()
-    for category in app_categories:
-        if category["Action"].lower() == settings.APP_ACTION_ALERT:
-            groups_for_non_managed_cats.append("APG-"+category["SubCategory"].lower())
-    target.add(ApplicationGroup(name='APG-non-managed-apps', value=groups_for_non_managed_cats))
+    staged_groups.append(target.add(ApplicationGroup(name='APG-non-managed-apps', value=groups_for_non_managed_cats)))
     print('done')
 
     # Read the application groups from the JSON file
@@ -48,18 +67,40 @@ def create_application_groups(target, panos_device, app_categories):
     # Check if metadata was successfully read
     if metadata:
         for app_group in metadata:
-            target.add(ApplicationGroup(name=app_group['name'], value=app_group['value']))
+            staged_groups.append(target.add(ApplicationGroup(name=app_group['name'], value=app_group['value'])))
     else:
         print("No application groups were added due to missing or invalid metadata.")
         sys.exit(1)
 
-    # Now we create Multi-Config Element XML for all staged app groups
-    action_id = 1
-    multi_config_xml = '<multi-config>'
-    for app_group in target.findall(ApplicationGroup):
-        if "None" not in app_group.xpath():
-            multi_config_xml += f'<edit id="{action_id}" xpath="{app_group.xpath()}">{app_group.element_str().decode()}</edit>'
-            action_id += 1
-    multi_config_xml += '</multi-config>'
+    # Now we collect xpath and element XML of all staged app groups for the Multi-Config API call
+    staged_edits = [(app_group.xpath(), app_group.element_str().decode()) for app_group in staged_groups]
+
+    return staged_edits
+
+
+def create_application_filters_and_groups(target, panos_device, app_categories):
+    """
+    Stages application filters and application groups and creates them all with a single Multi-Config API call.
+
+    Filter edits are placed before group edits because the groups reference the filters
+    (the Multi-Config API applies the edits in the order of their IDs).
+
+    Args:
+        target: Device Group or VSYS object where the application filters and groups will be created.
+        panos_device: Firewall or Panorama device object.
+        app_categories: List of application category dictionaries as read by parse_app_categories().
+    """
+    # The categories are normalized once and shared by both staging functions
+    normalized_categories = normalize_app_categories(app_categories)
+    staged_edits = create_application_filters(target, panos_device, normalized_categories)
+    staged_edits += create_application_groups(target, panos_device, normalized_categories)
+
+    # (the edits are collected in a list and joined once at the end)
+    multi_config_parts = ['<multi-config>']
+    for action_id, (xpath, element) in enumerate(staged_edits, start=1):
+        multi_config_parts.append(f'<edit id="{action_id}" xpath="{xpath}">{element}</edit>')
+    multi_config_parts.append('</multi-config>')
+    multi_config_xml = ''.join(multi_config_parts)
 
-    execute_multi_config_api_call(panos_device, multi_config_xml, "Creating the staged application groups...", 0)
+    execute_multi_config_api_call(panos_device, multi_config_xml, "Creating the staged application filters and groups...", 0,
+                                  num_operations=len(staged_edits))
@@ -13,22 +13,33 @@ This module provides a collection of helper functions used throughout the projec
 """
 
 import importlib
+import atexit
+import codecs
+import contextlib
+import functools
+import io
+from concurrent.futures import ThreadPoolExecutor
 import os.path
 import json
 import csv
 import sys
 import re
 import time
-import xml.dom.minidom
+from collections import defaultdict, namedtuple
+from operator import attrgetter
 from importlib import metadata as metadata
 
-import yaml
+# orjson is an optional, faster drop-in JSON parser; the standard library parser is used when it's not installed
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 from rich import print
 from rich.panel import Panel
-from rich.status import Status
-from lib.rich_output import console
+from lib.rich_output import console, plain_console
 
-from xmltodict import unparse
 from panos.errors   import PanDeviceXapiError
 from panos.policies import SecurityRule, DecryptionRule, AuthenticationRule, NatRule
 from panos.objects import Edl, ServiceObject, ServiceGroup, ApplicationGroup, ApplicationFilter, CustomUrlCategory, \
@@ -44,6 +55,114 @@ default_choice = None
 # Module-level variable to track whether execute_multi_config_api_call has been called before
 _first_multi_config_call = True
 
+# UserIDs of managed app and URL categories (category name -> UserID), built by get_source_user_for_category on first use
+app_category_users = None
+url_category_users = None
+
+# Fields of an address object compared by find_address_objects_delta
+get_address_object_attributes = attrgetter('name', 'type', 'value', 'tag', 'description')
+
+# Fields of an address group compared by find_address_groups_delta
+get_address_group_attributes = attrgetter('name', 'description', 'static_value', 'dynamic_value', 'tag')
+
+# Set once the warning about the pure-Python YAML loader has been shown
+yaml_loader_warning_shown = False
+
+# Parsed metadata files: (parser name, file name) -> (file modification time, parsed data)
+parsed_metadata_cache = {}
+
+# Attribute that every operation of a multi-config request has (used to count the operations).
+# The multi-config XML is an ASCII string, so str.count() already runs the same C search as bytes.count()
+# does - encoding the XML to bytes first would only add a copy of the whole request
+MULTI_CONFIG_OPERATION_ID = " id="
+
+# Characters of a rules file path that are replaced with the underscore in the module name
+# (space, slash, dot, backslash and dash)
+MODULE_NAME_TRANSLATION = str.maketrans(' /.\\-', '_____')
+
+# Indentation strings of the console output (index = indentation level)
+INDENTATION_TABS = tuple('\t' * level for level in range(16))
+
+# Write buffer size of the log files (128 KiB)
+LOG_FILE_BUFFER_SIZE = 128 * 1024
+
+# Log file of API calls, opened by get_api_calls_log_file on first use and kept open until the script exits
+api_calls_log_file = None
+
+
+def cache_parsed_metadata(parse_function):
+    """
+    Decorator for the parse_metadata_from_* functions that parses each file only once per run.
+
+    The cache entry is keyed by the parser and the file name and is invalidated when the modification
+    time of the file changes. Every caller receives the same cached object, so the parsed data is frozen
+    (see freeze_metadata) instead of being deep-copied on each call: a caller that needs to modify
+    the data works on its own copy (e.g. `dict(row)` or `list(rows)`).
+
+    Args:
+        parse_function: Function with the (type_display_name, file_name, suppress_output, **options) signature.
+            The keyword options (e.g. the columns of parse_metadata_from_csv) are part of the cache key.
+
+    Returns:
+        The wrapped function.
+    """
+    @functools.wraps(parse_function)
+    def wrapper(type_display_name, file_name, suppress_output=True, **options):
+        try:
+            modification_time = os.stat(file_name).st_mtime_ns
+        except OSError:
+            # the file is missing - the parser reports it
+            return parse_function(type_display_name, file_name, suppress_output, **options)
+
+        cache_key = (parse_function.__name__, file_name,
+                     tuple((name, tuple(value.items()) if isinstance(value, dict) else value) for name, value in sorted(options.items())))
+        cached_entry = parsed_metadata_cache.get(cache_key)
+        if cached_entry is not None and cached_entry[0] == modification_time:
+            if not suppress_output: print(f"\t\tMetadata type :: " + type_display_name.upper() + f" :: {len(cached_entry[1])} entries found (cached).")
+            return cached_entry[1]
+
+        metadata = parse_function(type_display_name, file_name, suppress_output, **options)
+        if metadata is not None:
+            metadata = freeze_metadata(metadata)
+            parsed_metadata_cache[cache_key] = (modification_time, metadata)
+        return metadata
+
+    return wrapper
+
+
+class ReadOnlyDict(dict):
+    """
+    Dictionary of the cached metadata that raises a TypeError on any modification.
+
+    It's still a dict (not a MappingProxyType), so it can be passed to xmltodict.unparse() and json.dumps()
+    as is. copy() and dict() return an ordinary, modifiable dictionary.
+    """
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("cached metadata is read-only (modify a copy of it instead)")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def copy(self):
+        return dict(self)
+
+
+def freeze_metadata(metadata):
+    """
+    Returns a read-only version of parsed metadata (dictionaries become ReadOnlyDict, lists become tuples).
+
+    Args:
+        metadata: Data returned by one of the parse_metadata_from_* functions.
+
+    Returns:
+        The same data with all nested dictionaries and lists frozen (other values are returned unchanged).
+    """
+    if isinstance(metadata, dict):
+        return ReadOnlyDict((key, freeze_metadata(value)) for key, value in metadata.items())
+    if isinstance(metadata, list):
+        return tuple(freeze_metadata(value) for value in metadata)
+    return metadata
+
 
 def get_source_user_for_category(category, category_type):
     """
@@ -65,19 +184,20 @@ def get_source_user_for_category(category, category_type):
     Raises:
         SystemExit: If the provided category type is invalid.
     """
-    source_user = None
+    global app_category_users, url_category_users
+
+    # The requirements files are parsed and indexed on the first call only
+    # (this function is called for every rule that references a managed category)
     if category_type.lower() == "app":
-        app_categories_requirements = parse_app_categories(settings.APP_CATEGORIES_REQUIREMENTS_FILENAME)
-        for entry in app_categories_requirements:
-            if category == entry["SubCategory"] and entry["Action"] == settings.APP_ACTION_MANAGE:
-                source_user = entry["UserID"]
-                break
+        if app_category_users is None:
+            app_category_users = index_managed_category_users(parse_app_categories(settings.APP_CATEGORIES_REQUIREMENTS_FILENAME),
+                                                              "SubCategory", settings.APP_ACTION_MANAGE)
+        source_user = app_category_users.get(category)
     elif category_type.lower() == "url":
-        url_categories_requirements = parse_url_categories(settings.URL_CATEGORIES_REQUIREMENTS_FILENAME)
-        for entry in url_categories_requirements:
-            if category == entry["Category"] and entry["Action"] == settings.URL_ACTION_MANAGE:
-                source_user = entry["UserID"]
-                break
+        if url_category_users is None:
+            url_category_users = index_managed_category_users(parse_url_categories(settings.URL_CATEGORIES_REQUIREMENTS_FILENAME),
+                                                              "Category", settings.URL_ACTION_MANAGE)
+        source_user = url_category_users.get(category)
     else:
         print(f"Invalid category type: {category_type}")
         sys.exit(1)
@@ -85,6 +205,26 @@ def get_source_user_for_category(category, category_type):
     return source_user
 
 
+def index_managed_category_users(categories_requirements, category_column, manage_action):
+    """
+    Builds a dictionary mapping names of managed categories to their UserID.
+
+    Args:
+        categories_requirements (list): Rows of the app or URL categories requirements file.
+        category_column (str): Column holding the category name ("SubCategory" or "Category").
+        manage_action (str): Value of the Action column that marks a category as managed.
+
+    Returns:
+        dict: Category name -> UserID (the first row wins if a category is listed more than once).
+    """
+    category_users = {}
+    for entry in categories_requirements or []:
+        if entry["Action"] == manage_action:
+            category_users.setdefault(entry[category_column], entry["UserID"])
+    return category_users
+
+
+@cache_parsed_metadata
 def parse_metadata_from_json(type_display_name, file_name, suppress_output=True):
     """
     Parses metadata from a JSON file.
@@ -98,26 +238,28 @@ def parse_metadata_from_json(type_display_name, file_name, suppress_output=True)
         dict or None: The parsed metadata as a dictionary, or None if the file does not exist or cannot be parsed.
     """
     metadata = None
-    if os.path.exists(file_name) and os.path.isfile(file_name):
-        if not suppress_output: print(f"\t\tMetadata type :: " + type_display_name.upper() + " :: file is found - parsing data...", end='')
-        # reading the file into a dictionary
-        try:
-            with open(file_name, mode='r', encoding='utf-8-sig') as json_file:
-                 metadata = json.load(json_file)
-            if not suppress_output: print(f'{len(metadata)} entries found.')
-        # handle exceptions
-        except json.JSONDecodeError as e:
-            print("Invalid JSON syntax:", e)
-        except FileNotFoundError:
-            print("The file was not found.")
-        except ValueError or IOError:
-            print("Failed to open the file (check if it's open in another program)")
-    else:
-        print(f"\t\tMetadata type :: " + type_display_name.upper() + " :: no files found")
+    # reading the file into a dictionary
+    # (the file is opened straight away - a missing file or a directory is handled by the exceptions below,
+    # so no separate existence checks are needed)
+    try:
+        # the file is read as raw bytes in one go and decoded by the JSON parser itself
+        # (orjson rejects a UTF-8 BOM, so it's removed beforehand)
+        with open(file_name, mode='rb') as json_file:
+            if not suppress_output: print(f"\t\tMetadata type :: " + type_display_name.upper() + " :: file is found - parsing data...", end='')
+            metadata = json_loads(json_file.read().removeprefix(codecs.BOM_UTF8))
+        if not suppress_output: print(f'{len(metadata)} entries found.')
+    # handle exceptions
+    except (FileNotFoundError, IsADirectoryError):
+        if not suppress_output: print(f"\t\tMetadata type :: " + type_display_name.upper() + " :: no files found")
+    except json.JSONDecodeError as e:
+        print("Invalid JSON syntax:", e)
+    except (ValueError, OSError):
+        print("Failed to open the file (check if it's open in another program)")
 
     return metadata
 
 
+@cache_parsed_metadata
 def parse_metadata_from_yaml(type_display_name, file_name, suppress_output=True):
     """
     Parses metadata from a YAML file.
@@ -130,166 +272,204 @@ def parse_metadata_from_yaml(type_display_name, file_name, suppress_output=True)
     Returns:
         dict or None: The parsed metadata as a dictionary, or None if the file does not exist or cannot be parsed.
     """
+    global yaml_loader_warning_shown
+
+    # PyYAML is imported here as only a few object types are defined in YAML files
+    import yaml
+
+    # The libyaml-based loader is an order of magnitude faster than the pure-Python one,
+    # but it's available only if PyYAML was built against libyaml
+    yaml_loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    if yaml_loader is yaml.SafeLoader and not yaml_loader_warning_shown and not settings.SUPPRESS_WARNINGS:
+        print("Warning: PyYAML is not built with libyaml - YAML files will be parsed by the slower pure-Python loader")
+        yaml_loader_warning_shown = True
+
     metadata = None
-    if os.path.exists(file_name) and os.path.isfile(file_name):
-        if not suppress_output: print(f"\t\tMetadata type :: " + type_display_name.upper() + " :: file is found - parsing data...", end='')
-        # reading the file into a dictionary
-        try:
-            with open(file_name, mode='r', encoding='utf-8-sig') as yaml_file:
-                 metadata = yaml.safe_load(yaml_file)
-            if not suppress_output: print(f'{len(metadata)} entries found.')
-        # handle exceptions
-        except yaml.YAMLError as e:
-            print("Invalid YAML syntax:", e)
-        except FileNotFoundError:
-            print("The file was not found.")
-        except ValueError or IOError:
-            print("Failed to open the file (check if it's open in another program)")
-    else:
-        print(f"\t\tMetadata type :: " + type_display_name.upper() + " :: no files found")
+    # reading the file into a dictionary
+    # (the file is opened straight away - a missing file or a directory is handled by the exceptions below,
+    # so no separate existence checks are needed)
+    try:
+        with open(file_name, mode='r', encoding='utf-8-sig') as yaml_file:
+            if not suppress_output: print(f"\t\tMetadata type :: " + type_display_name.upper() + " :: file is found - parsing data...", end='')
+            metadata = yaml.load(yaml_file, Loader=yaml_loader)
+        if not suppress_output: print(f'{len(metadata)} entries found.')
+    # handle exceptions
+    except (FileNotFoundError, IsADirectoryError):
+        if not suppress_output: print(f"\t\tMetadata type :: " + type_display_name.upper() + " :: no files found")
+    except yaml.YAMLError as e:
+        print("Invalid YAML syntax:", e)
+    except (ValueError, OSError):
+        print("Failed to open the file (check if it's open in another program)")
 
     return metadata
 
 
-def parse_metadata_from_csv(type_display_name, file_name, suppress_output=True):
+@cache_parsed_metadata
+def parse_metadata_from_csv(type_display_name, file_name, suppress_output=True, columns=None):
     """
     Reads a CSV file with metadata of a profile/object of a given type.
 
     Read data is stored in a list of dictionaries (one dictionary per row
     with column names used as dictionary keys).
 
+    If only a few known columns are needed, pass them in the columns argument: the rows are then
+    returned as named tuples holding only these columns (cheaper than a dictionary per row).
+
     Args:
         type_display_name (str): Type of the object ("EDL", "vulnerability", "antivirus", etc.)
         file_name (str): Path to the CSV file containing metadata.
         suppress_output (bool, optional): If True, suppresses output messages. Defaults to True.
+        columns (dict, optional): Named tuple field name -> CSV column name. Cells missing in a row
+            are returned as None (like csv.DictReader does). Defaults to None (rows are dictionaries).
 
     Returns:
-        list or None: A list of dictionaries containing the values read from the CSV.
+        list or None: A list of dictionaries (or named tuples) containing the values read from the CSV.
             Returns None if the file does not exist.
+
+    Raises:
+        ValueError: If one of the requested columns is not found in the header of the file.
     """
     if os.path.exists(file_name):
         if not suppress_output: print(f"\t\tMetadata type :: " + type_display_name.upper() + f" :: parsing [{file_name}]...", end='')
         # reading the file into a list of dictionaries
         metadata = list()
         with open(file_name, mode='r', encoding='utf-8-sig') as csv_file:
-            csv_reader = csv.DictReader(csv_file)
-            for row in csv_reader:
-                metadata.append(row)
+            if columns is None:
+                csv_reader = csv.DictReader(csv_file)
+                for row in csv_reader:
+                    metadata.append(row)
+            else:
+                # the header is read once to find the positions of the requested columns
+                csv_reader = csv.reader(csv_file)
+                header = next(csv_reader, [])
+                missing_columns = [column for column in columns.values() if column not in header]
+                if missing_columns:
+                    raise ValueError(f"Columns {missing_columns} are not found in the file '{file_name}'")
+                row_type = namedtuple('Row', columns.keys())
+                column_indexes = [header.index(column) for column in columns.values()]
+                for row in csv_reader:
+                    if row:  # csv.DictReader skips empty rows too
+                        row_length = len(row)
+                        metadata.append(row_type._make(row[i] if i < row_length else None for i in column_indexes))
         if not suppress_output: print(f'{len(metadata)} entries found.')
     else:
-        print(f"\t\tMetadata type :: " + type_display_name.upper() + " :: no files found")
+        if not suppress_output: print(f"\t\tMetadata type :: " + type_display_name.upper() + " :: no files found")
         metadata = None
 
     return metadata
 
 
-def find_address_objects_delta(current_address_objects, staged_address_objects):
-    def make_hashable(value):
-        if isinstance(value, list):
-            return tuple(value)  # Convert list to tuple
-        if isinstance(value, dict):
-            return frozenset(value.items())  # Convert dict to frozenset
-        return value  # Keep it as-is if it's already hashable
-
-    def to_comparable_set(objects):
-        return set(
-            (
-                make_hashable(obj.name),
-                make_hashable(obj.type),
-                make_hashable(obj.value),
-                make_hashable(sorted(obj.tag) if obj.tag is not None else []),
-                make_hashable(obj.description),
-            ) for obj in objects
-        )
-
-    # Generate comparable sets
-    current_set = to_comparable_set(current_address_objects)
-    staged_set  = to_comparable_set(staged_address_objects)
-
-    # Calculate deltas
-    in_current_not_in_staged = current_set - staged_set
-    in_staged_not_in_current = staged_set - current_set
-
-    # Convert deltas back to original objects
-    delta_current = [
-        obj for obj in current_address_objects
-        if (
-            make_hashable(obj.name),
-            make_hashable(obj.type),
-            make_hashable(obj.value),
-            make_hashable(sorted(obj.tag) if obj.tag is not None else []),
-            make_hashable(obj.description),
-        ) in in_current_not_in_staged
-    ]
-
-    delta_staged = [
-        obj for obj in staged_address_objects
-        if (
-            make_hashable(obj.name),
-            make_hashable(obj.type),
-            make_hashable(obj.value),
-            make_hashable(sorted(obj.tag) if obj.tag is not None else []),
-            make_hashable(obj.description),
-        ) in in_staged_not_in_current
-    ]
+def address_object_delta_key(obj):
+    # Comparable key of an address object
+    # all address object fields are strings, except for the list of tags
+    name, address_type, value, tag, description = get_address_object_attributes(obj)
+    return name, address_type, value, tuple(sorted(tag)) if tag else (), description
+
+
+def address_group_delta_key(obj):
+    # Comparable key of an address group
+    # empty and missing values are normalized with 'or' (both "" and None become the same key part).
+    # Each key is built exactly once per object, so every list is sorted only once (sorted() + tuple() in one step)
+    name, description, static_value, dynamic_value, tag = get_address_group_attributes(obj)
+    return (
+        name,
+        description or None,
+        tuple(sorted(static_value)) if static_value else (),
+        dynamic_value or None,  # the dynamic filter is a single string, so it is not sorted
+        tuple(sorted(tag)) if tag else ()
+    )
+
+
+def find_objects_delta(current_objects, staged_objects, key_function):
+    # Comparable dictionaries: key -> original object (the key of each object is computed only once).
+    # map() and zip() run the loop over the objects in C, only the key function itself is executed in Python
+    current_map = dict(zip(map(key_function, current_objects), current_objects))
+    staged_map  = dict(zip(map(key_function, staged_objects), staged_objects))
+
+    # Calculate deltas (the original objects are taken directly from the dictionaries, in their original order)
+    delta_current = [obj for key, obj in current_map.items() if key not in staged_map]
+    delta_staged  = [obj for key, obj in staged_map.items() if key not in current_map]
 
     return delta_current, delta_staged
 
 
+def find_address_objects_delta(current_address_objects, staged_address_objects):
+    return find_objects_delta(current_address_objects, staged_address_objects, address_object_delta_key)
+
+
 def find_address_groups_delta(current_address_groups, staged_address_groups):
-    def make_hashable(value):
-        if isinstance(value, list):
-            return tuple(value)  # Convert list to tuple
-        if isinstance(value, dict):
-            return frozenset(value.items())  # Convert dict to frozenset
-        return value  # Keep it as-is if it's already hashable
-
-    def to_comparable_set(objects):
-        return set(
-            (
-                make_hashable(obj.name),
-                make_hashable(obj.description if obj.description not in ("", None) else None),
-                make_hashable(sorted(obj.static_value) if obj.static_value is not None else []),
-                make_hashable(sorted(obj.dynamic_value) if obj.dynamic_value is not None else []),
-                make_hashable(sorted(obj.tag) if obj.tag is not None else [])
-            ) for obj in objects
-        )
-
-    # Generate comparable sets
-    current_set = to_comparable_set(current_address_groups)
-    staged_set = to_comparable_set(staged_address_groups)
-
-    # Calculate deltas
-    in_current_not_in_staged = current_set - staged_set
-    in_staged_not_in_current = staged_set - current_set
-
-    # Convert deltas back to original objects
-    delta_current = [
-        obj for obj in current_address_groups
-        if (
-            make_hashable(obj.name),
-            make_hashable(obj.description if obj.description not in ("", None) else None),
-            make_hashable(sorted(obj.static_value) if obj.static_value is not None else []),
-            make_hashable(sorted(obj.dynamic_value) if obj.dynamic_value is not None else []),
-            make_hashable(sorted(obj.tag) if obj.tag is not None else [])
-        ) in in_current_not_in_staged
-    ]
-
-    delta_staged = [
-        obj for obj in staged_address_groups
-        if (
-            make_hashable(obj.name),
-            make_hashable(obj.description if obj.description not in ("", None) else None),
-            make_hashable(sorted(obj.static_value) if obj.static_value is not None else []),
-            make_hashable(sorted(obj.dynamic_value) if obj.dynamic_value is not None else []),
-            make_hashable(sorted(obj.tag) if obj.tag is not None else [])
-        ) in in_staged_not_in_current
-    ]
+    return find_objects_delta(current_address_groups, staged_address_groups, address_group_delta_key)
+
+
+# Human-friendly names of the object classes (used in the output)
+OBJECT_DISPLAY_NAMES = {
+    SecurityRule:           "security rule",
+    DecryptionRule:         "decryption rule",
+    NatRule:                "NAT rule",
+    AuthenticationRule:     "authentication rule",
+    Edl:                    "EDL",
+    ServiceObject:          "service",
+    ServiceGroup:           "service group",
+    ApplicationGroup:       "application group",
+    ApplicationFilter:      "application filter",
+    CustomUrlCategory:      "custom URL category",
+    LogForwardingProfile:   "log forwarding profile",
+    Tag:                    "tag"
+}
+
+
+def get_object_display_name(cls):
+    """
+    Returns the human-friendly (singular) name of an object class for the output.
 
-    return delta_current, delta_staged
+    Classes missing from OBJECT_DISPLAY_NAMES fall back to the lowercase class name (with a warning).
+    """
+    obj_name = OBJECT_DISPLAY_NAMES.get(cls)
+    if obj_name is None:
+        print(f"Warning: Unmapped type '{cls.__name__}'. Falling back to default naming.")
+        obj_name = cls.__name__.lower()
+    return obj_name
+
+
+def delete_objects_in_one_call(panos_device, objects_to_delete, failure_mode="hard", transactional=False):
+    """
+    Deletes objects of several types on a PAN-OS device with a single multi-config API call.
+
+    Unlike delete_objects() (one call per object type), all objects are sent in one call.
+    The deletions are performed in the given order, so the objects that reference other objects
+    (e.g. service groups) must come before the objects they reference (e.g. service objects).
+
+    Args:
+        panos_device: The PAN-OS device on which the objects will be deleted.
+        objects_to_delete: A list of objects to delete (each object must have a `xpath` method).
+        failure_mode: Specifies how failures should be handled. Defaults to "hard".
+        transactional: Whether the deletion should be executed in strict transactional mode. Defaults to False.
+
+    Returns:
+        bool: True if the objects were deleted (or there was nothing to delete), False if the API call failed.
+    """
+    if not objects_to_delete:
+        return True
+
+    # Construct multi-config XML (the action IDs are arbitrary numbers that increment for each element)
+    multi_config_parts = ['<multi-config>']
+    for action_id, o in enumerate(objects_to_delete, start=1):
+        multi_config_parts.append(f'<delete id="{action_id}" xpath="{o.xpath()}"></delete>')
+    multi_config_parts.append('</multi-config>')
+
+    # The output lists the number of objects of each type (in the order the types first appear)
+    objects_per_type = defaultdict(int)
+    for o in objects_to_delete:
+        objects_per_type[type(o)] += 1
+    objects_summary = ", ".join(f"{count} {pluralize(get_object_display_name(cls)) if count > 1 else get_object_display_name(cls)}"
+                                for cls, count in objects_per_type.items())
+
+    return execute_multi_config_api_call(panos_device, ''.join(multi_config_parts),
+                                         f"Deleting {len(objects_to_delete)} objects ({objects_summary})...", 0,
+                                         failure_mode, transactional, num_operations=len(objects_to_delete))
 
 
-def delete_objects(panos_device, objects_to_delete, failure_mode="hard", transactional=False):
+def delete_objects(panos_device, objects_to_delete, failure_mode="hard", transactional=False, chunk_size=None):
     """
     Deletes specified objects on a PAN-OS device using a multi-config API call.
 
@@ -301,53 +481,82 @@ def delete_objects(panos_device, objects_to_delete, failure_mode="hard", transac
     Args:
         panos_device: The PAN-OS device on which the objects will be deleted.
         objects_to_delete: A list of objects to delete. Each object must have a `xpath` method
-            that returns the XPath of the object on the device.
+            that returns the XPath of the object on the device. Objects of different types are
+            deleted with one multi-config call per type (in the order the types first appear).
         failure_mode: Specifies how failures should be handled during the deletion process.
             Defaults to "hard".
         transactional: A boolean indicating whether the deletion should be executed transactionally.
             This means that when a commit operation is active or a commit is pending, the operation will fail.
             When there are uncommitted changes for the user performing the operation,
             they will be rolled back before performing the operation.
+        chunk_size: Maximum number of objects deleted with one multi-config call. If omitted, all
+            objects of the same type are deleted with a single call. A chunk size of 1 deletes the objects
+            one by one (so a failed deletion does not prevent the deletion of the other objects).
+
+    The objects that could not be deleted (in the `soft` failure mode) are reported in one summary per type.
+    When the objects are deleted one by one, the progress is shown with a single progress bar per type, and
+    the individual API errors are only written to the error log (and printed in debug mode).
     """
     if objects_to_delete is not None and len(objects_to_delete) > 0:
-        # Initialize a starting action ID (arbitrary number that increments for each element)
-        action_id = 1
-        # Construct multi-config XML
-        multi_config_xml = '<multi-config>'
-        for o in objects_to_delete:
-            multi_config_xml += f'<delete id="{action_id}" xpath="{o.xpath()}"></delete>'
-            action_id += 1
-        multi_config_xml += '</multi-config>'
-
-        # Map classes to their desired display strings
-        mapping = {
-            SecurityRule:           "security rule",
-            DecryptionRule:         "decryption rule",
-            NatRule:                "NAT rule",
-            AuthenticationRule:     "authentication rule",
-            Edl:                    "EDL",
-            ServiceObject:          "service",
-            ServiceGroup:           "service group",
-            ApplicationGroup:       "application group",
-            ApplicationFilter:      "application filter",
-            CustomUrlCategory:      "custom URL category",
-            LogForwardingProfile:   "log forwarding profile",
-            Tag:                    "tag"
-        }
-
-        # Let's create a human-friendly name of the objects we're deleting
-        cls = type(objects_to_delete[0])
-        if cls not in mapping:
-            print(f"Warning: Unmapped type '{cls.__name__}'. Falling back to default naming.")
-            obj_name = cls.__name__.lower()
-        else:
-            obj_name = mapping.get(cls)
-
-        # Let's go crazy and make the name plural if we have more than one object :)
-        if len(objects_to_delete) > 1: obj_name=pluralize(obj_name)
+        # tqdm is imported here as the progress bar is shown only when the objects are deleted one by one
+        from tqdm import tqdm
 
-        # Now we execute the multi-config request
-        execute_multi_config_api_call(panos_device, multi_config_xml, f"Deleting {len(objects_to_delete)} {obj_name}...", 0, failure_mode, transactional)
+        # Group the objects by their type (in the order of first appearance), so that each type
+        # is deleted with its own multi-config call and reported under its own name
+        objects_by_type = defaultdict(list)
+        for o in objects_to_delete:
+            objects_by_type[type(o)].append(o)
+
+        for cls, objects_of_type in objects_by_type.items():
+            # Let's create a human-friendly name of the objects we're deleting
+            obj_name = get_object_display_name(cls)
+            # Let's go crazy and make the name plural if we have more than one object :)
+            obj_name_plural = pluralize(obj_name)
+
+            # The objects are sent in chunks of at most chunk_size objects (one multi-config call per chunk)
+            total = len(objects_of_type)
+            step = chunk_size if chunk_size else total
+            # the errors of single-object calls are summarized below instead of being printed one by one
+            report_errors = step > 1 or settings.DEBUG_OUTPUT
+            failed_objects = []
+            # Objects deleted one by one are shown with a single progress bar instead of a status line per object
+            show_status = step > 1
+            progress_bar = None if show_status else tqdm(total=total, desc=f"Deleting {obj_name_plural}", ncols=100, colour='white')
+            for start in range(0, total, step):
+                chunk = objects_of_type[start:start + step]
+                # Construct multi-config XML (the action IDs are arbitrary numbers that increment for each element)
+                multi_config_parts = ['<multi-config>']
+                for action_id, o in enumerate(chunk, start=1):
+                    multi_config_parts.append(f'<delete id="{action_id}" xpath="{o.xpath()}"></delete>')
+                multi_config_parts.append('</multi-config>')
+                multi_config_xml = ''.join(multi_config_parts)
+
+                if step >= total:
+                    output_message = f"Deleting {total} {obj_name_plural if total > 1 else obj_name}..."
+                elif step == 1:
+                    output_message = f"Deleting {obj_name} [{chunk[0].name}] ({start + 1} of {total})..."
+                else:
+                    output_message = (f"Deleting {len(chunk)} {obj_name_plural if len(chunk) > 1 else obj_name} "
+                                      f"({start + 1}-{start + len(chunk)} of {total})...")
+
+                # Now we execute the multi-config request
+                if not execute_multi_config_api_call(panos_device, multi_config_xml, output_message, 0, failure_mode, transactional,
+                                                     num_operations=len(chunk), report_errors=report_errors,
+                                                     show_status=show_status):
+                    failed_objects.extend(chunk)
+                if progress_bar is not None:
+                    progress_bar.update(len(chunk))
+            if progress_bar is not None:
+                progress_bar.close()
+
+            # One summary of all objects of this type that were not deleted
+            # (when a chunk of several objects fails, some of its objects may have been deleted before the error)
+            if failed_objects:
+                failed_names = ", ".join(f"[{o.name}]" for o in failed_objects)
+                failed_count = f"{len(failed_objects)} {obj_name_plural if len(failed_objects) > 1 else obj_name}"
+                failure = f"Failed to delete {failed_count}" if step == 1 else f"Failed to delete (some of) {failed_count}"
+                # (printed without markup parsing - rich would take the bracketed names for style tags)
+                plain_console.print(f"{failure} (see the log file [{settings.API_ERROR_LOG_FILENAME}] for details): {failed_names}")
 
 
 def delete_non_sdk_objects(object_container, panos_device, objects_to_delete=()):
@@ -446,39 +655,57 @@ def delete_non_sdk_objects(object_container, panos_device, objects_to_delete=())
         }
     }
 
+    # (the edits are collected in a list and joined once at the end)
     action_id = 1
-    multi_config_xml = '<multi-config>'
-
-    for obj_key, obj_details in object_types.items():
-        if obj_key in objects_to_delete:
-            print(f"Enumerating {obj_details['display_name']}...", end="")
-
-            xpath = object_container.xpath() + f"/{obj_details['xpath']}"
-            profile_objects = panos_device.xapi.get(xpath)
-            print(profile_objects.attrib['status'], end="")
-
-            all_names = []
-            if profile_objects.attrib['status'] == 'success':
-                if settings.VERBOSE_OUTPUT: print(":")
-                num_of_entries = 0
-                for entries in profile_objects.findall(f".//{obj_details['type']}"):
-                    for entry in entries.findall("entry"):
-                        name = entry.get("name")
-                        all_names.append(name)
-                        num_of_entries += 1
-                        if settings.VERBOSE_OUTPUT: print(f"\t{name}")
-                if not settings.VERBOSE_OUTPUT: print(f" ({num_of_entries} entries found and staged for deletion)")
+    multi_config_parts = ['<multi-config>']
+
+    # The XPath of the container is the same for all objects
+    base_xpath = object_container.xpath()
+
+    # Requested object types as a set for constant-time membership checks
+    types_to_delete = frozenset(objects_to_delete)
+    # (the order of object_types is preserved - it defines the order of deletion)
+    types_to_enumerate = [obj_details for obj_key, obj_details in object_types.items() if obj_key in types_to_delete]
+
+    def get_objects(xapi, obj_details):
+        return xapi.get(f"{base_xpath}/{obj_details['xpath']}")
+
+    # The object types are independent, so they are enumerated concurrently (one GET request per type)
+    # and the results are then processed in the original order.
+    # Each request uses its own API handle (pan.xapi keeps the state of the last request in the handle).
+    # The handles are generated here, before the threads are started, so the API key is retrieved
+    # only once (by the first handle) instead of by several threads at the same time.
+    xapi_handles = [panos_device.generate_xapi() for _ in types_to_enumerate]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        enumerated_objects = list(executor.map(get_objects, xapi_handles, types_to_enumerate))
+
+    for obj_details, profile_objects in zip(types_to_enumerate, enumerated_objects):
+        print(f"Enumerating {obj_details['display_name']}...", end="")
+
+        xpath = f"{base_xpath}/{obj_details['xpath']}"
+        print(profile_objects.attrib['status'], end="")
+
+        all_names = []
+        if profile_objects.attrib['status'] == 'success':
+            for entries in profile_objects.findall(f".//{obj_details['type']}"):
+                all_names.extend(entry.get("name") for entry in entries.findall("entry"))
+            # the names are printed with a single call (rich parses the markup of every printed string)
+            if settings.VERBOSE_OUTPUT:
+                print(":" + "".join(f"\n\t{name}" for name in all_names))
             else:
-                print(" (failed to enumerate objects)")
+                print(f" ({len(all_names)} entries found and staged for deletion)")
+        else:
+            print(" (failed to enumerate objects)")
 
-            if all_names:
-                for name in all_names:
-                    obj_xpath = object_container.xpath() + f"/{obj_details['xpath']}/entry[@name='{name}']"
-                    multi_config_xml += f'<delete id="{action_id}" xpath="{obj_xpath}"></delete>'
-                    action_id += 1
+        if all_names:
+            for name in all_names:
+                obj_xpath = f"{xpath}/entry[@name='{name}']"
+                multi_config_parts.append(f'<delete id="{action_id}" xpath="{obj_xpath}"></delete>')
+                action_id += 1
 
-    multi_config_xml += '</multi-config>'
-    execute_multi_config_api_call(panos_device, multi_config_xml, "Deleting all staged objects...", 0)
+    multi_config_parts.append('</multi-config>')
+    multi_config_xml = ''.join(multi_config_parts)
+    execute_multi_config_api_call(panos_device, multi_config_xml, "Deleting all staged objects...", 0, num_operations=action_id - 1)
 
 
 def create_non_sdk_objects(object_container, panos_device, objects_to_create=()):
@@ -551,8 +778,11 @@ def create_non_sdk_objects(object_container, panos_device, objects_to_create=())
         }
     }
 
-    # Validate objects_to_create
-    invalid_objects = [obj for obj in objects_to_create if obj not in object_types]
+    # xmltodict is needed only here, so it's imported when the objects are actually created
+    from xmltodict import unparse
+
+    # Validate objects_to_create (the order of the requested types is preserved, so it's kept as a sequence)
+    invalid_objects = sorted(frozenset(objects_to_create).difference(object_types))
     if invalid_objects:
         raise ValueError(f"Invalid object types specified: {invalid_objects}")
 
@@ -560,15 +790,20 @@ def create_non_sdk_objects(object_container, panos_device, objects_to_create=())
     print("Staging objects for creation:", ", ".join(object_types[obj]['display_name'] for obj in objects_to_create))
 
     # Initialiase a counter and multi-config XML
+    # (the XML is written into a single buffer - xmltodict serializes each element straight into it)
     action_id = 1
-    multi_config_xml = "<multi-config>"
+    multi_config_buffer = io.StringIO()
+    multi_config_buffer.write("<multi-config>")
+
+    # The XPath of the container is the same for all objects
+    base_xpath = object_container.xpath()
 
     # Loop through all types of the objects that must be created
     for obj_type in objects_to_create:
         # Get object info
         obj_type_info = object_types[obj_type]
         # Get object's relative XPath (from the object info)
-        obj_xpath     = object_container.xpath() + f"/{obj_type_info['xpath']}"
+        obj_xpath     = f"{base_xpath}/{obj_type_info['xpath']}"
 
         # List all files in the given folder and analyze JSON and YAML files
         for file_name in os.listdir(obj_type_info['folder']):
@@ -583,17 +818,18 @@ def create_non_sdk_objects(object_container, panos_device, objects_to_create=())
                     # now the 'object_definition' variable contains definition of the object in a form of a dictionary
                     if object_definition is not None:
                         print(f"\t{object_definition['entry']['@name']}")
-                        # then we construct the element
+                        # then we construct the element and add the object definition to the multiconfig XML
+                        multi_config_buffer.write(f'<set id="{action_id}" xpath="{obj_xpath}">')
                         if settings.DEBUG_OUTPUT:
                             # if DEBUG_OUTPUT is enabled we generate the element with pretty formatting
                             obj_element = unparse(object_definition, pretty=True, full_document=False)
                             # and output the object's definition to the console
                             print(f'Staged multi-config op #{action_id}:\n', obj_element)
+                            multi_config_buffer.write(obj_element)
                         else:
                             # if DEBUG_OUTPUT is not required, we generate the XML code in a condensed non-pretty form
-                            obj_element = unparse(object_definition, pretty=False, full_document=False)
-                        # we add the object definition to the multiconfig XML
-                        multi_config_xml += f'<set id="{action_id}" xpath="{obj_xpath}">{obj_element}</set>'
+                            unparse(object_definition, output=multi_config_buffer, pretty=False, full_document=False)
+                        multi_config_buffer.write('</set>')
                         # and increment the counter
                         action_id += 1
                     else:
@@ -603,12 +839,161 @@ def create_non_sdk_objects(object_container, panos_device, objects_to_create=())
             # Then we repeat the loop for the next file (= object definition) found in the folder
         # Then we repeat the loop for the next object type
     # Once we've finished with all object type we add a closing tag to the multi-config XML code
-    multi_config_xml += '</multi-config>'
+    multi_config_buffer.write('</multi-config>')
+    multi_config_xml = multi_config_buffer.getvalue()
     # and execute the code (all objects will be created in one large multi_config API call)
-    execute_multi_config_api_call(panos_device, multi_config_xml, f"Creating the staged objects...", 0)
+    execute_multi_config_api_call(panos_device, multi_config_xml, f"Creating the staged objects...", 0, num_operations=action_id - 1)
 
 
-def execute_multi_config_api_call(panos_device, multi_config_xml, output_message, indentation_level, failure_mode="hard", strict_transactional=False):
+def format_xml_for_log(xml_string):
+    """
+    Formats an XML string with indentation for the API calls log.
+
+    The XML libraries are imported here, so they're loaded only when API calls are logged.
+    lxml (optional) is used when it's installed - it's faster and provides the same
+    fromstring/indent/tostring interface as ElementTree from the standard library.
+
+    Args:
+        xml_string (str): The XML to format.
+
+    Returns:
+        str: The indented XML or, if the XML can't be parsed, the original XML preceded by the error message.
+    """
+    try:
+        from lxml import etree as ET
+    except ImportError:
+        import xml.etree.ElementTree as ET
+
+    try:
+        # Parse the XML string and format it with proper indentation
+        # (both parsers are C-based and indent in place, unlike the pure-Python minidom,
+        # and they produce neither the XML declaration nor empty lines)
+        root = ET.fromstring(xml_string)
+        ET.indent(root, space="  ")
+        return ET.tostring(root, encoding="unicode")
+    except Exception as e:
+        # Fallback to original XML if parsing fails
+        return f"Error formatting XML: {str(e)}\n{xml_string}"
+
+
+def get_api_calls_log_file(truncate=False):
+    """
+    Returns the log file of API calls (settings.API_CALLS_LOG_FILENAME).
+
+    The file is opened on the first call and then kept open for the rest of the session
+    (it's closed automatically when the script exits), so logging an API call doesn't
+    require reopening the file every time.
+
+    Args:
+        truncate (bool): If True, the content logged so far is discarded. Defaults to False.
+
+    Returns:
+        The log file object (text mode).
+    """
+    global api_calls_log_file
+
+    if api_calls_log_file is None:
+        # a large write buffer - a single API call can produce thousands of log lines
+        api_calls_log_file = open(settings.API_CALLS_LOG_FILENAME, "w" if truncate else "a", buffering=LOG_FILE_BUFFER_SIZE)
+        atexit.register(api_calls_log_file.close)
+    elif truncate:
+        api_calls_log_file.seek(0)
+        api_calls_log_file.truncate()
+
+    return api_calls_log_file
+
+
+def enable_xapi_connection_pooling():
+    """
+    Makes the XML API calls of pan-python reuse the HTTPS connections to the device.
+
+    pan.xapi sends every API call with urllib.request.urlopen(), so each call opens a new TCP connection
+    and performs a new TLS handshake. This function replaces the method that sends the calls with one that
+    uses a requests.Session, so the connections are kept alive and reused across the calls. Each thread
+    uses its own session (requests does not guarantee that a session is thread-safe).
+    The calls with a custom SSL context, with GET requests or with a request body (file imports)
+    are still sent by the original method. Calling the function more than once has no further effect.
+
+    The replaced method is private to pan.xapi, so the patch is applied only for the pan-python versions
+    it has been checked against (the XAPI_CONNECTION_POOLING_PAN_PYTHON_VERSIONS setting);
+    for any other version a warning is shown and the API calls are sent by pan-python unchanged.
+
+    Returns:
+        bool: True if the connection pooling is enabled, False if the installed pan-python is not supported.
+    """
+    import threading
+    import pan
+    import pan.xapi
+    import requests
+    import urllib3
+    from pan import DEBUG1, DEBUG2
+    from urllib.parse import urlencode
+
+    original_api_request = pan.xapi.PanXapi._PanXapi__api_request
+    if getattr(original_api_request, "connection_pooling", False):
+        return True
+
+    # (the version of the imported module, which is the code being patched)
+    pan_python_version = pan.__version__
+    if ".".join(pan_python_version.split(".")[:2]) not in settings.XAPI_CONNECTION_POOLING_PAN_PYTHON_VERSIONS:
+        if not settings.SUPPRESS_WARNINGS:
+            print(f"Warning: XML API connection pooling is not supported with pan-python {pan_python_version} "
+                  f"(supported versions: {', '.join(settings.XAPI_CONNECTION_POOLING_PAN_PYTHON_VERSIONS)}) - it will not be used")
+        return False
+
+    # One session (and so one connection pool) per thread
+    thread_sessions = threading.local()
+    # pan.xapi does not verify the certificate of the device without an SSL context (and neither do we)
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    def pooled_api_request(xapi, query, body=None, headers={}):
+        if body is not None or xapi.ssl_context is not None or xapi.use_get:
+            return original_api_request(xapi, query, body, headers)
+
+        # the request is logged the same way as by pan.xapi (with the API key and the password masked)
+        xapi._PanXapi__debug_request(query)
+
+        # the API key is not URL-encoded again (the same as in pan.xapi)
+        if "key" in query:
+            query = dict(query)
+            key = query.pop("key")
+            data = f"{urlencode(query)}&key={key}"
+        else:
+            data = urlencode(query)
+        xapi._log(DEBUG1, "method: %s", "POST")
+
+        session = getattr(thread_sessions, "session", None)
+        if session is None:
+            session = thread_sessions.session = requests.Session()
+
+        try:
+            response = session.post(xapi.uri, data=data.encode(), verify=False, timeout=xapi.timeout,
+                                    headers={"Content-Type": "application/x-www-form-urlencoded"})
+        except requests.RequestException as e:
+            xapi.status_detail = f"{type(e).__name__}: {e}"
+            return False
+        if not response.ok:
+            # the same message as pan.xapi gives for an HTTP error
+            xapi.status_detail = f"URLError: code: {response.status_code} reason: {response.reason}"
+            return False
+
+        # pan.xapi reads the body and the headers of the response through these attributes
+        response.pan_body = response.content
+        response.getheader = response.headers.get
+        response.info = lambda: response.headers
+        response.closed = True
+
+        xapi._log(DEBUG2, "HTTP response headers:")
+        xapi._log(DEBUG2, "%s", response.info())
+        return response
+
+    pooled_api_request.connection_pooling = True
+    pan.xapi.PanXapi._PanXapi__api_request = pooled_api_request
+    return True
+
+
+def execute_multi_config_api_call(panos_device, multi_config_xml, output_message, indentation_level, failure_mode="hard", strict_transactional=False,
+                                  num_operations=None, report_errors=True, show_status=True):
     """
     Executes a multi-configuration API call on a specified PAN-OS device.
 
@@ -636,6 +1021,15 @@ def execute_multi_config_api_call(panos_device, multi_config_xml, output_message
             This parameter can be overridden by the global flag MAKE_THE_FIRST_MULTI_CONFIG_TRANSACTIONAL
             for the first call to always be True.
             This is the default behavior.
+        num_operations: Number of operations in `multi_config_xml` (used in the reported statistics).
+            If omitted, the operations are counted in the XML itself. Defaults to `None`.
+        report_errors: If False, an API error in the `soft` failure mode is only written to the error log
+            (the caller reports the failure itself). Defaults to `True`.
+        show_status: If False, neither the status spinner nor the final status line is shown
+            (the caller shows the progress itself). Defaults to `True`.
+
+    Returns:
+        bool: True if the API call succeeded, False if it failed (in the `soft` failure mode).
     """
     global _first_multi_config_call
 
@@ -649,43 +1043,27 @@ def execute_multi_config_api_call(panos_device, multi_config_xml, output_message
         # Get current timestamp
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
 
-        # Determine file mode (overwrite or append)
-        file_mode = "w" if strict_transactional else "a"
-
-        # Log the API call to file
-        with open(settings.API_CALLS_LOG_FILENAME, file_mode) as f:
-            f.write(f"============== API Call at {timestamp} ====================\n")
-            f.write(f"Strict Transactional:      {strict_transactional}\n")
-            f.write(f"Associated output message: {output_message}\n")
-            f.write("XML Content (formatted for readability):\n\n")
-            # Pretty print the XML content
-            try:
-                # Parse the XML string and format it with proper indentation
-                dom = xml.dom.minidom.parseString(multi_config_xml)
-                pretty_xml = dom.toprettyxml(indent="  ")
-
-                # Remove XML declaration line
-                if pretty_xml.startswith('<?xml'):
-                    pretty_xml = pretty_xml[pretty_xml.find('?>') + 2:].lstrip()
-
-                # Remove empty lines
-                pretty_xml = '\n'.join(line for line in pretty_xml.split('\n') if line.strip())
-
-                f.write(pretty_xml)
-            except Exception as e:
-                # Fallback to original XML if parsing fails
-                f.write(f"Error formatting XML: {str(e)}\n")
-                f.write(multi_config_xml)
-            f.write("\n\n")
-
-    tabs = '\t' * indentation_level
-    status_message = f"{tabs}{output_message}"
+        # Log the API call to file (the log is overwritten by strict transactional calls and appended to otherwise)
+        f = get_api_calls_log_file(truncate=strict_transactional)
+        f.write(f"============== API Call at {timestamp} ====================\n")
+        f.write(f"Strict Transactional:      {strict_transactional}\n")
+        f.write(f"Associated output message: {output_message}\n")
+        f.write("XML Content (formatted for readability):\n\n")
+        # Pretty print the XML content
+        f.write(format_xml_for_log(multi_config_xml))
+        f.write("\n\n")
+        f.flush()
+
+    # the common indentation strings are prepared in advance
+    tabs = INDENTATION_TABS[indentation_level] if indentation_level < len(INDENTATION_TABS) else '\t' * indentation_level
+    status_message = tabs + output_message
     if strict_transactional:
         status_message = f"{status_message} ([bold]strict transactional mode[/bold])"
 
     final_status_message = None
 
-    with console.status(status_message, spinner="dots") as status_spinner:
+    status_display = console.status(status_message, spinner="dots") if show_status else contextlib.nullcontext()
+    with status_display as status_spinner:
         try:
             start_time = time.time()
             status = panos_device.xapi.multi_config(multi_config_xml, strict=strict_transactional)
@@ -696,63 +1074,88 @@ def execute_multi_config_api_call(panos_device, multi_config_xml, output_message
             total_sec = int(elapsed_time)
             total_ms = int((elapsed_time - total_sec) * 1000)
 
-            # Count number of operations (occurrences of " id=" in the XML)
-            num_operations = multi_config_xml.count(" id=")
-            if num_operations > 0:
-                avg_time = elapsed_time / num_operations
-                avg_sec = int(avg_time)
-                avg_ms = int((avg_time - avg_sec) * 1000)
-                avg_str = f"{avg_sec}s {avg_ms}ms"
+            # Count number of operations (occurrences of " id=" in the XML) unless the caller already knows it
+            if num_operations is None:
+                num_operations = multi_config_xml.count(MULTI_CONFIG_OPERATION_ID)
+
+            # The average time per operation is reported only in verbose output and in the API calls log
+            if settings.VERBOSE_OUTPUT or settings.LOG_API_CALLS:
+                if num_operations > 0:
+                    avg_time = elapsed_time / num_operations
+                    avg_sec = int(avg_time)
+                    avg_ms = int((avg_time - avg_sec) * 1000)
+                    avg_str = f"{avg_sec}s {avg_ms}ms"
+                else:
+                    avg_str = "N/A"
+                timing_details = f"{total_sec}s {total_ms}ms, {num_operations} ops, AVG: {avg_str} per op"
             else:
-                avg_str = "N/A"
+                timing_details = f"{total_sec}s {total_ms}ms, {num_operations} ops"
 
             # Update the status with a green tick if successful
-            result_message = f'{status.attrib["status"]} ({total_sec}s {total_ms}ms, {num_operations} ops, AVG: {avg_str} per op)'
+            result_message = f'{status.attrib["status"]} ({timing_details})'
             if status.attrib["status"] == "success":
                 final_status_message = f"{status_message} [green]✓[/green] {result_message}"
             else:
                 final_status_message = f"{status_message} [yellow]![/yellow] {result_message}"
 
-            status_spinner.update(final_status_message)
+            if status_spinner is not None:
+                status_spinner.update(final_status_message)
 
             if settings.LOG_API_CALLS:
                 # Get current timestamp
                 timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
 
                 # Log the API responses to file
-                with open(settings.API_CALLS_LOG_FILENAME, "a") as f:
-                    f.write(f"--- API Response at {timestamp} ---\n")
-                    f.write(f"Result: {result_message}\n")
-                    f.write("PAN-OS detailed response:\n\n")
-                    # Output the result to the file
-                    try:
-                        for response in status.findall('.//response'):
-                            resp_status = response.get('status')
-                            code = response.get('code')
-                            action_id = response.get('id')
-                            msg = response.find('msg').text if response.find('msg') is not None else None
-                            f.write(f"\tID: {action_id}, Status: {resp_status}, Code: {code}, Msg: {msg}\n")
-                            if settings.DEBUG_OUTPUT:
-                                console.print(f"{tabs}ID: {action_id}, Status: {resp_status}, Code: {code}, Msg: {msg}")
-                        f.write(f"==================================================================\n\n\n\n")
-                    except Exception as e:
-                        console.print(f"Error writing the response to the file '{settings.API_CALLS_LOG_FILENAME}':")
-                        console.print(f"{str(e)}\n")
+                f = get_api_calls_log_file()
+                f.write(f"--- API Response at {timestamp} ---\n")
+                f.write(f"Result: {result_message}\n")
+                f.write("PAN-OS detailed response:\n\n")
+                # Output the result to the file
+                try:
+                    # the entries are collected first and then written to the file
+                    # (and printed in debug mode) in one go
+                    response_entries = []
+                    for response in status.iterfind('.//response'):
+                        get_attribute = response.get
+                        resp_status = get_attribute('status')
+                        code = get_attribute('code')
+                        action_id = get_attribute('id')
+                        # the <msg> node is looked up only once
+                        msg_element = response.find('msg')
+                        msg = msg_element.text if msg_element is not None else None
+                        response_entries.append(f"ID: {action_id}, Status: {resp_status}, Code: {code}, Msg: {msg}")
+                    f.write("".join(f"\t{entry}\n" for entry in response_entries))
+                    f.write(f"==================================================================\n\n\n\n")
+                    if settings.DEBUG_OUTPUT and response_entries:
+                        console.print("\n".join(f"{tabs}{entry}" for entry in response_entries))
+                except Exception as e:
+                    console.print(f"Error writing the response to the file '{settings.API_CALLS_LOG_FILENAME}':")
+                    console.print(f"{str(e)}\n")
+                # the file stays open, so the entry is flushed to make the log readable while the script is running
+                f.flush()
 
         except PanDeviceXapiError as e:
-            console.print('-- XML API error --')
-            with open(settings.API_ERROR_LOG_FILENAME, "w") as f:
-                f.write(str(e))
-            console.print('-' * 80)
-            console.print(e.message)
-            console.print('-' * 80)
-            console.print(f"If the message above appears truncated, review the log file [{settings.API_ERROR_LOG_FILENAME}] for the full error message.")
+            # Errors are appended to the log (with a timestamp), so the errors of previous calls and runs are kept
+            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+            with open(settings.API_ERROR_LOG_FILENAME, "a", buffering=LOG_FILE_BUFFER_SIZE) as f:
+                f.write(f"============== API Error at {timestamp} ====================\n")
+                f.write(f"Associated output message: {output_message}\n\n")
+                f.write(f"{str(e)}\n\n")
+            if report_errors or failure_mode == "hard":
+                # (printed without markup parsing - the API error and the bracketed log file path are not rich markup)
+                plain_console.print('-- XML API error --')
+                plain_console.print('-' * 80)
+                plain_console.print(e.message)
+                plain_console.print('-' * 80)
+                plain_console.print(f"If the message above appears truncated, review the last entry of the log file [{settings.API_ERROR_LOG_FILENAME}] for the full error message.")
             if failure_mode == "hard":
                 sys.exit(1)
+            return False
 
     # Print the final status message after the context manager exits
-    if final_status_message:
+    if final_status_message and show_status:
         console.print(final_status_message)
+    return True
 
 
 def load_module_from_file(module_name, file_path):
@@ -764,6 +1167,10 @@ def load_module_from_file(module_name, file_path):
     the module code within that spec. It then returns the loaded module object
     to the caller.
 
+    The loaded module is registered in sys.modules, so a module that has already
+    been loaded under the same name is returned straight away (its code is not
+    executed again).
+
     Args:
         module_name: Name of the module as a string. This is the name under
             which the module will be available upon loading.
@@ -774,12 +1181,54 @@ def load_module_from_file(module_name, file_path):
         The loaded module object, which can be used to access functions,
         classes, or variables defined in the module.
     """
+    # Return the module if it has already been loaded
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
     spec = importlib.util.spec_from_file_location(module_name, file_path)
     module = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(module)
+    # the module is registered only once its code has been executed successfully
+    sys.modules[module_name] = module
     return module
 
 
+def find_rules_files(directory):
+    """
+    Finds all 'rules.py' files in a directory tree.
+
+    The tree is traversed with os.scandir(), which gets the type of each entry from the directory
+    listing itself, so no separate stat() call is needed per entry. In each directory, its own
+    'rules.py' comes first, followed by the subdirectories in alphabetical order (the same order
+    as a top-down os.walk() with sorted directories). Symbolic links to directories are not followed.
+
+    Args:
+        directory (str): The root directory to search for 'rules.py' files.
+
+    Yields:
+        tuple: The directory containing the file and the path to the file.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            rules_file_path = None
+            subdirectories = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry)
+                elif entry.name == "rules.py":
+                    rules_file_path = entry.path
+    except OSError:
+        # a directory that can't be read is skipped (like os.walk() does)
+        return
+
+    if rules_file_path is not None:
+        yield directory, rules_file_path
+
+    for subdirectory in sorted(subdirectories, key=attrgetter('name')):
+        yield from find_rules_files(subdirectory.path)
+
+
 def find_and_import_rules(directory):
     """
     Finds and imports rule definitions from Python files within a given directory.
@@ -807,70 +1256,70 @@ def find_and_import_rules(directory):
     """
     all_rules = []
     all_subfolder_names = []
-    list_of_invalid_rules = []
+    set_of_invalid_rules = set()  # a rule with both an invalid name and description is recorded once
+
+    # The validation flags are evaluated once for all rules
+    validate_rule_names         = settings.PERFORM_VALIDATION_CHECKS and settings.VALIDATE_RULE_NAMES
+    validate_rule_descriptions  = settings.PERFORM_VALIDATION_CHECKS and settings.VALIDATE_RULE_DESCRIPTIONS
 
     # Traverse the directory structure
-    for root, dirs, files in os.walk(directory):
-        # Sort directories and files to ensure a consistent processing order
-        dirs.sort()
-        files.sort()
-        for file in files:
-            if file == "rules.py":
-                file_path = os.path.join(root, file)
-                # Normalize the path to ensure consistency in slashes
-                file_path = os.path.normpath(file_path).replace(os.sep, "/")
-                # Create a unique module name based on the file path
-                # first, we remove the file extension
-                module_name = file_path.replace(".py", "")
-                # second, we substitute all slashes, dots and spaces with the underscore
-                module_name_normilized = re.sub(r"[ /.\\-]", "_", module_name)
-                # finally, we Load the module from the normalized file path
-                try:
-                    module = load_module_from_file(module_name_normilized, file_path)
-                except SyntaxError as e:
-                    print(f"!!! Syntax error in rule definitions in the file: '{file_path}'")
-                    print(e)
-                    sys.exit(1)
-
-                # Check if 'section_rules' and 'section_defaults' are present
-                if hasattr(module, 'section_rules') and hasattr(module, 'section_defaults'):
-                    # Merge defaults with each rule, ensuring not to overwrite existing keys
-                    updated_rules = []
-                    folder_name = os.path.basename(root)  # Get the subfolder name
-                    for rule in module.section_rules:
-                        # Start with a copy of the defaults
-                        merged_rule = module.section_defaults.copy()
-                        # Update the merged rule with the actual rule, preserving the rule's original keys
-                        merged_rule.update(rule)
-                        # Now the merged_rule is a dictionary that describes the rule that is going to be created
-                        # here you can add some code
-                        # that validates the complaince of the rule with your requirements
-                        # such as a naming convention or a presence of a non-default description
-
-                        # ------ validation code starts -----
-                        if settings.PERFORM_VALIDATION_CHECKS and settings.VALIDATE_RULE_NAMES:
-                            if not validate_string_for_compliance(merged_rule['name'],
-                                                                  settings.VALIDATION_PATTERN_FOR_RULE_NAMES,
-                                                                  "rule name",
-                                                                  "is not compliant with the naming convention"):
-                                list_of_invalid_rules.append(merged_rule['name'])
-
-                        if settings.PERFORM_VALIDATION_CHECKS and settings.VALIDATE_RULE_DESCRIPTIONS:
-                            if not validate_string_for_compliance(merged_rule['description'],
-                                                           settings.VALIDATION_PATTERN_FOR_RULE_DESCRIPTIONS,
-                                                           "rule description",
-                                                           "is not compliant with the naming convention (must be from 12 to 1024 characters long)"):
-                                list_of_invalid_rules.append(merged_rule['name'])
-                        # ------ validation code ends -------
-
-                        # append the rule to the list of rules
-                        updated_rules.append(merged_rule)
-                        all_subfolder_names.append(folder_name)  # Append folder name for each rule
-                    all_rules.extend(updated_rules)
+    # (the rules files are processed one by one in the main process - there are only a few of them, and
+    # starting worker processes, which would need to import the whole PAN-OS stack, would take much longer)
+    for root, file_path in find_rules_files(directory):
+        # Normalize the path to ensure consistency in slashes
+        file_path = os.path.normpath(file_path).replace(os.sep, "/")
+        # Create a unique module name based on the file path
+        # first, we remove the file extension
+        module_name = file_path.replace(".py", "")
+        # second, we substitute all slashes, dots and spaces with the underscore
+        module_name_normilized = module_name.translate(MODULE_NAME_TRANSLATION)
+        # finally, we Load the module from the normalized file path
+        try:
+            module = load_module_from_file(module_name_normilized, file_path)
+        except SyntaxError as e:
+            print(f"!!! Syntax error in rule definitions in the file: '{file_path}'")
+            print(e)
+            sys.exit(1)
+
+        # Check if 'section_rules' and 'section_defaults' are present
+        if hasattr(module, 'section_rules') and hasattr(module, 'section_defaults'):
+            # Merge defaults with each rule, ensuring not to overwrite existing keys
+            updated_rules = []
+            folder_name = os.path.basename(root)  # Get the subfolder name
+            section_defaults = module.section_defaults
+            for rule in module.section_rules:
+                # Start with the defaults and add the actual rule on top of them, preserving the rule's original keys
+                # (the merged dictionary is built in a single step)
+                merged_rule = {**section_defaults, **rule}
+                # Now the merged_rule is a dictionary that describes the rule that is going to be created
+                # here you can add some code
+                # that validates the complaince of the rule with your requirements
+                # such as a naming convention or a presence of a non-default description
+
+                # ------ validation code starts -----
+                if validate_rule_names:
+                    if not validate_string_for_compliance(merged_rule['name'],
+                                                          settings.VALIDATION_PATTERN_FOR_RULE_NAMES,
+                                                          "rule name",
+                                                          "is not compliant with the naming convention"):
+                        set_of_invalid_rules.add(merged_rule['name'])
+
+                if validate_rule_descriptions:
+                    if not validate_string_for_compliance(merged_rule['description'],
+                                                   settings.VALIDATION_PATTERN_FOR_RULE_DESCRIPTIONS,
+                                                   "rule description",
+                                                   "is not compliant with the naming convention (must be from 12 to 1024 characters long)"):
+                        set_of_invalid_rules.add(merged_rule['name'])
+                # ------ validation code ends -------
+
+                # append the rule to the list of rules
+                updated_rules.append(merged_rule)
+            all_rules.extend(updated_rules)
+            all_subfolder_names.extend([folder_name] * len(updated_rules))  # Append folder name for each rule
 
     # validation action (after we parsed all rules in all folders)
-    if settings.PERFORM_VALIDATION_CHECKS and list_of_invalid_rules:
-        console.print(f"Here is the list of all policy rules with invalid name and/or description: {list(set(list_of_invalid_rules))}")
+    if settings.PERFORM_VALIDATION_CHECKS and set_of_invalid_rules:
+        console.print(f"Here is the list of all policy rules with invalid name and/or description: {sorted(set_of_invalid_rules)}")
         console.print(f"You can make the script terminate on validation errors by setting the [bold]SOFT_VALIDATION_ONLY[/bold] flag to [bold]False[/bold].")
         if not settings.SOFT_VALIDATION_ONLY:
             console.print(f"The validation errors are causing the program to exit now (you can change "
@@ -884,6 +1333,18 @@ def find_and_import_rules(directory):
     return all_rules, all_subfolder_names
 
 
+@functools.lru_cache(maxsize=None)
+def compile_validation_pattern(regex_pattern):
+    # Each validation pattern is compiled only once
+    return re.compile(regex_pattern)
+
+
+@functools.lru_cache(maxsize=4096)
+def is_compliant_string(string_to_validate, regex_pattern):
+    # Returns True if the whole string matches the pattern
+    return compile_validation_pattern(regex_pattern).fullmatch(string_to_validate) is not None
+
+
 def validate_string_for_compliance(string_to_validate, regex_pattern, validated_entity_name, message_to_display_if_no_match):
     """
     Validates a string against a given regex pattern and displays a message if the validation fails.
@@ -901,10 +1362,8 @@ def validate_string_for_compliance(string_to_validate, regex_pattern, validated_
         message_to_display_if_no_match: A message that will be appended in the console output when
             validation fails.
     """
-    # Compile the passed regex pattern
-    pattern = re.compile(regex_pattern)
-    # Check if there is a match
-    if not pattern.fullmatch(string_to_validate):
+    # Check if there is a match (the results are cached, as many rules share the same name or description)
+    if not is_compliant_string(string_to_validate, regex_pattern):
         console.print(f"[bold red]Validation Error:[/bold red] "
                       f"The {validated_entity_name} "
                       f"[bold]'{string_to_validate}'[/bold] "
@@ -929,11 +1388,14 @@ def pluralize(word):
     Returns:
         str: The pluralized form of the input word.
     """
-    if re.search(r'y$', word) and not re.search(r'[aeiou]y$', word):
-        return re.sub(r'y$', 'ies', word)
+    # plain string checks are enough for this rule, so no regular expressions are needed
+    # (word[-2:-1] is empty for a one-letter word, just like the preceding letter was missing)
+    if word.endswith('y') and word[-2:-1] not in ('a', 'e', 'i', 'o', 'u'):
+        return word[:-1] + 'ies'
     return word + 's'
 
 
+@functools.lru_cache(maxsize=None)
 def version_tuple(version_str):
     """
     Convert a version string to a tuple of integers for comparison.
@@ -947,6 +1409,23 @@ def version_tuple(version_str):
     return tuple(map(int, version_str.split('.')))
 
 
+@functools.lru_cache(maxsize=None)
+def get_package_version(package_name):
+    """
+    Returns the installed version of a Python package.
+
+    The version is read from the package metadata on the first call only
+    (reading it requires scanning the installed distributions).
+
+    Args:
+        package_name (str): Name of the distribution package (e.g. "pan-os-python").
+
+    Returns:
+        str: The version string of the installed package.
+    """
+    return metadata.version(package_name)
+
+
 def load_menu_options() -> dict | None:
     """
     Loads menu options (policy targets) from a JSON file defined by the global
@@ -958,8 +1437,8 @@ def load_menu_options() -> dict | None:
     global menu_options
 
     # Check if installed module versions meet minimum requirements
-    pan_os_python_version = metadata.version("pan-os-python")
-    pan_python_version    = metadata.version("pan-python")
+    pan_os_python_version = get_package_version("pan-os-python")
+    pan_python_version    = get_package_version("pan-python")
 
     # Display version information if verbose output is enabled
     if settings.VERBOSE_OUTPUT:
@@ -985,6 +1464,24 @@ def load_menu_options() -> dict | None:
     return menu_options
 
 
+def get_effective_default_choice():
+    """
+    Returns the menu option that is used as the default choice.
+
+    This is the option set in `default_choice` if it's one of the menu options,
+    otherwise the first menu option.
+
+    Returns:
+        str or None: The default menu option or None if there are no menu options.
+    """
+    if not menu_options:
+        return None
+    # Check if default_choice is a valid key in menu_options
+    if default_choice and default_choice in menu_options:
+        return default_choice
+    return next(iter(menu_options))
+
+
 def display_menu() -> None:
     """
     Displays a menu of options for the user to select from.
@@ -993,11 +1490,8 @@ def display_menu() -> None:
     is indicated with an asterisk. Prompts the user to select an option,
     notifying about the default option when pressing Enter.
     """
-    # Check if default_choice is a valid key in menu_options
-    valid_default = default_choice in menu_options if menu_options and default_choice else False
-    
     # Determine which option should be marked as default
-    effective_default = default_choice if valid_default else list(menu_options.keys())[0] if menu_options else None
+    effective_default = get_effective_default_choice()
 
     menu_content = "Please select an option (press Enter for default *):\n\n"
     for i, option in enumerate(menu_options, 1):
@@ -1028,17 +1522,17 @@ def get_user_choice() -> int:
              or 0 if the exit option was selected.
     """
     num_options = len(menu_options)
-    # Check if default_choice is a valid key in menu_options
-    valid_default = default_choice in menu_options if menu_options and default_choice else False
-    # Determine which option should be used as default
-    effective_default = default_choice if valid_default else list(menu_options.keys())[0] if menu_options else None
-    
+    # Determine which option should be used as default and its index in the menu
+    # (the menu doesn't change while the user is prompted, so this is done once before the loop)
+    effective_default = get_effective_default_choice()
+    default_index = list(menu_options).index(effective_default) + 1 if effective_default else None
+
     while True:
         try:
             choice = input(f"\nEnter your choice (0-{num_options}, Enter for default *): ").strip()
             if choice == "":
                 if effective_default:
-                    return list(menu_options.keys()).index(effective_default) + 1  # Return the index of the effective default choice
+                    return default_index  # Return the index of the effective default choice
                 else:
                     # This should not happen if menu_options is properly loaded
                     print("\nNo default option available. Please make a selection.")
@@ -15,9 +15,8 @@ It serves as the main entry point for policy deployment operations and
 coordinates the functionality provided by other modules.
 """
 
-from panos.firewall import Firewall
+from concurrent.futures import ThreadPoolExecutor
 from panos.policies                     import SecurityRule, DecryptionRule, NatRule, AuthenticationRule, PolicyBasedForwarding, ApplicationOverride
-from tqdm                               import tqdm
 from lib.rich_output                    import console
 from rich.panel                         import Panel
 
@@ -33,12 +32,8 @@ from panos.errors import PanDeviceXapiError
 import settings
 import sys
 
-from lib.security_policy_pre            import security_policy_pre
-from lib.security_policy_post           import security_policy_post
-from lib.decryption_policy              import decryption_policy
 from lib.manage_tags                    import create_tags, tag_applications
-from lib.application_filters            import create_application_filters
-from lib.application_groups             import create_application_groups
+from lib.application_groups             import create_application_filters_and_groups
 from lib.security_profile_groups        import create_security_profile_groups
 from lib.edls                           import create_edls
 from lib.url_categories                 import create_custom_url_categories
@@ -47,12 +42,200 @@ from lib.service_objects                import create_service_objects
 from lib.security_profile_url_filtering import create_url_filtering_static_profiles, create_url_filtering_auto_profiles
 from lib.log_forwarding_profiles        import create_log_forwarding_profiles
 from lib.service_now                    import generate_categories_for_servicenow
-from lib.auxiliary_functions            import (delete_objects, delete_non_sdk_objects, create_non_sdk_objects,
-                                                execute_multi_config_api_call)
+from lib.auxiliary_functions            import (delete_objects, delete_objects_in_one_call, delete_non_sdk_objects,
+                                                create_non_sdk_objects, execute_multi_config_api_call)
 from lib.custom_objects                 import import_custom_signatures, import_custom_response_pages
 
 
-def discover_and_delete_policy_rules(panos_device, target, rule_type):
+# Policy rule types and their classes
+RULE_CLASSES = {
+    'security': SecurityRule,
+    'decryption': DecryptionRule,
+    'nat': NatRule,
+    'authentication': AuthenticationRule,
+    'override': ApplicationOverride,
+    'pbf': PolicyBasedForwarding
+}
+
+
+def bulk_deletion_chunk_size(bulk_deletion):
+    """
+    Returns the number of objects deleted with one multi-config call.
+
+    With the bulk deletion flag set, the objects are deleted in chunks of settings.BULK_DELETION_CHUNK_SIZE.
+    Otherwise, they are deleted one by one (one object per call).
+    """
+    return settings.BULK_DELETION_CHUNK_SIZE if bulk_deletion else 1
+
+
+def detach_objects(parent, objects):
+    """
+    Removes the objects from the children of the parent object (without any API calls).
+
+    The list of children is rebuilt once instead of calling parent.remove() for each object
+    (every remove() scans the whole list, which is slow for tens of thousands of objects).
+    """
+    if not objects:
+        return
+    detached_object_ids = set(map(id, objects))
+    parent.children = [child for child in parent.children if id(child) not in detached_object_ids]
+    for o in objects:
+        o.parent = None
+
+
+def delete_and_detach_objects(panos_device, parent, objects, failure_mode="hard", chunk_size=None):
+    """
+    Deletes the objects on the device (see delete_objects()) and then removes them from the parent object.
+
+    Args:
+        panos_device: Firewall or Panorama device object.
+        parent: Device Group or VSYS object the objects belong to.
+        objects: The objects to delete.
+        failure_mode: Passed to delete_objects(). Defaults to "hard".
+        chunk_size: Passed to delete_objects(). Defaults to None (all objects of a type in one call).
+    """
+    delete_objects(panos_device, objects, failure_mode, chunk_size=chunk_size)
+    detach_objects(parent, objects)
+
+
+def get_objects_config(panos_device, parent, object_class):
+    """
+    Retrieves the configuration of all objects of one type under the parent (as refreshall() does).
+
+    The API call is sent with its own API handle, so several calls can run in parallel threads
+    (the API handle of the device object is not thread-safe).
+
+    Returns:
+        tuple: An instance of the class bound to the parent and the XML element with the objects
+        (None if there are no objects of this type).
+    """
+    class_instance = object_class()
+    class_instance.parent = parent
+    try:
+        response = panos_device.generate_xapi().get(class_instance.xpath_nosuffix(), retry_on_peer=object_class.HA_SYNC)
+    except PanDeviceXapiError as e:
+        if not str(e).startswith("No such node"):
+            raise
+        return class_instance, None
+    return class_instance, response.find(f"result/{class_instance.XPATH.rsplit('/', 1)[-1]}")
+
+
+def get_application_group_members(panos_device, parent):
+    """
+    Retrieves the names and members of all application groups under the parent.
+
+    Only the group names and members are read from the XML. Building the full SDK objects is not needed
+    to find the container groups and delete the groups, and it is expensive when there are many groups.
+
+    Returns:
+        dict: The members of each application group (group name -> list of members).
+    """
+    _, xml = get_objects_config(panos_device, parent, ApplicationGroup)
+    if xml is None:
+        return {}
+    return {entry.get('name'): [member.text for member in entry.iterfind('members/member')]
+            for entry in xml.iterfind('entry')}
+
+
+def order_application_groups_for_deletion(application_groups):
+    """
+    Splits the application groups into layers in the order they can be deleted.
+
+    A group can only be deleted after all groups it is nested in. The first layer holds the groups
+    that are not nested in any other group, the next layer holds the groups nested only in the groups
+    of the previous layers, and so on (Kahn's topological sort, processed layer by layer).
+    Groups left in a reference cycle (which PAN-OS does not allow) are returned as the last layer.
+
+    Args:
+        application_groups (dict): The members of each application group (group name -> list of members).
+
+    Returns:
+        list: Layers of group names (each layer is a list that can be deleted with one multi-config call).
+    """
+    group_names = set(application_groups)
+
+    # the nested groups of each group and the number of groups each group is nested in
+    nested_groups = {name: group_names.intersection(members or ()) for name, members in application_groups.items()}
+    parent_count = dict.fromkeys(application_groups, 0)
+    for nested in nested_groups.values():
+        for name in nested:
+            parent_count[name] += 1
+
+    layers = []
+    layer = [name for name, count in parent_count.items() if count == 0]
+    while layer:
+        layers.append(layer)
+        next_layer = []
+        for name in layer:
+            for nested_name in nested_groups[name]:
+                parent_count[nested_name] -= 1
+                if parent_count[nested_name] == 0:
+                    next_layer.append(nested_name)
+        layer = next_layer
+
+    remaining_groups = [name for name, count in parent_count.items() if count > 0]
+    if remaining_groups:
+        layers.append(remaining_groups)
+    return layers
+
+
+def refresh_objects_concurrently(panos_device, parent, object_classes):
+    """
+    Retrieves the current objects of several independent types in parallel.
+
+    The API calls are sent concurrently (one thread per object type), so the total time is that of the
+    slowest call rather than the sum of all of them. The XML is parsed in the calling thread, and
+    the objects are attached to the parent exactly as refreshall() would do it.
+
+    Args:
+        panos_device: Firewall or Panorama device object.
+        parent: Device Group or VSYS object the objects belong to.
+        object_classes: Sequence of the object classes to retrieve.
+
+    Returns:
+        dict: The retrieved objects (a list per object class).
+    """
+    with ThreadPoolExecutor(max_workers=len(object_classes)) as executor:
+        responses = list(executor.map(lambda object_class: get_objects_config(panos_device, parent, object_class), object_classes))
+
+    current_objects = {}
+    for object_class, (class_instance, xml) in zip(object_classes, responses):
+        instances = class_instance.refreshall_from_xml(xml) if xml is not None else []
+        parent.removeall(cls=object_class)
+        parent.extend(instances)
+        current_objects[object_class] = instances
+    return current_objects
+
+
+def discover_all_policy_rules(panos_device, rulebases):
+    """
+    Retrieves the existing policy rules of all types with a single API call per rulebase.
+
+    Each rulebase is fetched as a whole, and the SDK then parses the rules of all types found in it
+    and attaches them to the rulebase object. This way discover_and_delete_policy_rules() can take
+    the rules from the rulebase (with refresh=False) instead of fetching each rule type separately.
+
+    Args:
+        panos_device: Firewall or Panorama device object.
+        rulebases: A dictionary with the 'pre' and 'post' rulebases (Panorama) or a Rulebase object (firewall).
+    """
+    with console.status("Retrieving current policy rules...", spinner="dots") as status_spinner:
+        for rulebase in (rulebases.values() if isinstance(rulebases, dict) else (rulebases,)):
+            rulebase_xpath = rulebase.xpath()
+            try:
+                response = panos_device.xapi.get(rulebase_xpath)
+            except PanDeviceXapiError as e:
+                # an empty rulebase may not exist in the config at all
+                if not str(e).startswith("No such node"):
+                    raise
+                continue
+            rulebase_element = response.find(f"result/{rulebase_xpath.rsplit('/', 1)[-1]}")
+            if rulebase_element is not None:
+                rulebase.refresh(xml=rulebase_element)
+        status_spinner.update("Retrieving current policy rules...completed")
+
+
+def discover_and_delete_policy_rules(panos_device, target, rule_type, refresh=True):
     """
     Fetches and deletes policy rules of a specific type on a Palo Alto Networks device.
 
@@ -69,6 +252,8 @@ def discover_and_delete_policy_rules(panos_device, target, rule_type):
             This can be either a Vsys or a DeviceGroup object.
         rule_type: The type of policy rule to manage. Supported types include
             'security', 'decryption', 'nat', 'authentication', 'override', and 'pbf'.
+        refresh: If True (default), the rules are retrieved from the device. If False, the rules
+            already retrieved by discover_all_policy_rules() are used.
 
     Returns:
         tuple: A tuple containing two elements:
@@ -79,88 +264,83 @@ def discover_and_delete_policy_rules(panos_device, target, rule_type):
     Raises:
         ValueError: If an unsupported rule type is specified.
     """
-    rule_classes = {
-        'security': SecurityRule,
-        'decryption': DecryptionRule,
-        'nat': NatRule,
-        'authentication': AuthenticationRule,
-        'override': ApplicationOverride,
-        'pbf': PolicyBasedForwarding
-    }
-
-    rule_class = rule_classes.get(rule_type)
+    rule_class = RULE_CLASSES.get(rule_type)
     if not rule_class:
         raise ValueError(f"Unsupported rule type: {rule_type}")
 
     # Get friendly name for output
     friendly_name = rule_type.replace('_', ' ')
 
-    # Get current rules
-    print(f'Looking for existing {friendly_name} policy rules...', end='')
+    # The settings are read once
+    verbose_output       = settings.VERBOSE_OUTPUT
+    bulk_rule_deletion   = settings.BULK_RULE_DELETION
+    # (if there is no explicit flag DELETE_CURRENT_<rule type>_POLICY = True, the rules won't be deleted)
+    delete_flag          = getattr(settings, f"DELETE_CURRENT_{rule_type.upper()}_POLICY", False)
+
+    # The current rules of the other types are needed only to delete them or to list them in the verbose output
+    # (the UUIDs are reused for security rules only), so there is nothing to do here otherwise
+    if rule_type != 'security' and not delete_flag and not verbose_output:
+        return [], {}
+
+    # The device type is checked only once (Panorama has pre- and post-rulebases, a firewall has just one rulebase)
+    is_panorama = isinstance(panos_device, Panorama)
 
+    # Get current rules
     current_rules = []
     current_rules_pre = []
     current_rules_post = []
 
-    if isinstance(panos_device, Panorama):
-        current_rules_pre  = rule_class.refreshall(target.get('pre'))
-        current_rules_post = rule_class.refreshall(target.get('post'))
+    # (the rules are either retrieved now or taken from the rulebases refreshed by discover_all_policy_rules)
+    get_rules = rule_class.refreshall if refresh else lambda rulebase: rulebase.findall(rule_class)
+    if is_panorama:
+        current_rules_pre  = get_rules(target.get('pre'))
+        current_rules_post = get_rules(target.get('post'))
         current_rules      = current_rules_pre + current_rules_post
-        print(f'found {len(current_rules)} rule(s)')
     else:
-        current_rules = rule_class.refreshall(target)
-        print(f'found {len(current_rules)} rule(s)')
+        current_rules = get_rules(target)
+    # (the result is printed in one go once the rules are known)
+    console.print(f'Looking for existing {friendly_name} policy rules...found {len(current_rules)} rule(s)')
 
-    # Store UUIDs if the policy type supports that (ApplicationOverride class does not)
+    # In verbose mode the current rules are listed (with one console.print call for the whole list)
+    # and their UUIDs are stored if the policy type supports that (ApplicationOverride class does not)
     rule_uuids = {}
-    if rule_type in ['security', 'decryption', 'nat', 'pbf', 'authentication'] and settings.VERBOSE_OUTPUT:
-        print(f"Existing {friendly_name} rules:")
-        if isinstance(panos_device, Panorama):
-            for prerule in current_rules_pre:
-                if settings.VERBOSE_OUTPUT: console.print(f"\t{prerule.name}")
-                rule_uuids[prerule.name] = prerule.uuid
-            if len(current_rules_post) != 0:
-                console.print("-" * 64)
-            for postrule in current_rules_post:
-                if settings.VERBOSE_OUTPUT: console.print(f"\t{postrule.name}")
-                rule_uuids[postrule.name] = postrule.uuid
-        else:
-            for rule in current_rules:
-                if settings.VERBOSE_OUTPUT: console.print(f"\t{rule.name}")
-                rule_uuids[rule.name] = rule.uuid
-    elif settings.VERBOSE_OUTPUT:
-        if isinstance(panos_device, Panorama):
-            if len(current_rules_pre) != 0:
-                for prerule in current_rules_pre: console.print(f"\t{prerule.name}")
+    if verbose_output:
+        stores_uuids = rule_type in ['security', 'decryption', 'nat', 'pbf', 'authentication']
+        output_lines = [f"Existing {friendly_name} rules:"] if stores_uuids else []
+        if is_panorama:
+            output_lines.extend(f"\t{prerule.name}" for prerule in current_rules_pre)
             if len(current_rules_post) != 0:
-                console.print("-" * 64)
-                for postrule in current_rules_post: console.print(f"\t{postrule.name}")
+                output_lines.append("-" * 64)
+                output_lines.extend(f"\t{postrule.name}" for postrule in current_rules_post)
         else:
-            if len(current_rules) != 0:
-                for rule in current_rules: console.print(f"\t{rule.name}")
+            output_lines.extend(f"\t{rule.name}" for rule in current_rules)
+        if output_lines:
+            console.print("\n".join(output_lines))
+        if stores_uuids:
+            rule_uuids = {rule.name: rule.uuid for rule in current_rules}
 
     # Delete rules if needed
-    # (if there is no explicit flag DELETE_CURRENT_<rule type>_POLICY = True, the rules won't be deleted)
-    delete_flag = getattr(settings, f"DELETE_CURRENT_{rule_type.upper()}_POLICY", False)
-
     if current_rules and delete_flag:
-        if settings.BULK_RULE_DELETION:
-            delete_objects(panos_device, current_rules)
-            if isinstance(panos_device, Panorama):
-                rule_class.refreshall(target.get('pre'))
-                rule_class.refreshall(target.get('post'))
-            else:
-                rule_class.refreshall(target)
-        else:
+        # Without the bulk flag the rules are deleted one by one (a chunk of one rule per multi-config call)
+        if not bulk_rule_deletion:
             console.print(f"Deleting existing {friendly_name} rules one by one (this may take a while)...")
-            for rule in tqdm(current_rules, desc=f"Deleting {friendly_name} rules", ncols=100, colour='white'):
-                rule.delete()
+        delete_objects(panos_device, current_rules, chunk_size=bulk_deletion_chunk_size(bulk_rule_deletion))
+        # The deleted rules are removed from the rulebase objects as well
+        # (there is no need to retrieve the rules again - we have just deleted all of them)
+        if is_panorama:
+            target.get('pre').removeall(cls=rule_class)
+            target.get('post').removeall(cls=rule_class)
+        else:
+            target.removeall(cls=rule_class)
 
     return current_rules, rule_uuids
 
 
 def create_security_rules(panos_device, app_categories_requirements, url_categories_requirements, rule_uuids, target_environment):
     """Create security policy rules"""
+    # the policy modules are imported only when the rules of this type are created
+    from lib.security_policy_pre  import security_policy_pre
+    from lib.security_policy_post import security_policy_post
     policy_rules_pre,  security_pre_group_tags = security_policy_pre(app_categories_requirements, rule_uuids, panos_device, target_environment)
     policy_rules_post, security_post_group_tags = security_policy_post(app_categories_requirements, url_categories_requirements, rule_uuids, panos_device, target_environment)
     return policy_rules_pre, policy_rules_post
@@ -168,6 +348,8 @@ def create_security_rules(panos_device, app_categories_requirements, url_categor
 
 def create_decryption_rules(panos_device, target_environment):
     """Create decryption policy rules"""
+    # the policy module is imported only when the rules of this type are created
+    from lib.decryption_policy import decryption_policy
     decryption_rules_pre, decryption_pre_group_tags = decryption_policy(panos_device, settings.DECRYPTION_RULES_PRE_FOLDER, target_environment)
     decryption_rules_post, decryption_post_group_tags = decryption_policy(panos_device, settings.DECRYPTION_RULES_POST_FOLDER, target_environment)
     return decryption_rules_pre, decryption_rules_post
@@ -202,6 +384,80 @@ def create_pbf_rules(panos_device, target_environment):
     return [], []
 
 
+def refresh_system_info_once(panos_device):
+    """
+    Retrieves the system info of the device (platform, PAN-OS and content versions, serial number)
+    unless it has already been retrieved for this device object.
+
+    The SDK stores the system info in the device object itself, so the info lives as long as the device object:
+    a new device object (e.g. after a reconnect or an upgrade) retrieves it again.
+    """
+    # (the content version is only known once the system info has been retrieved)
+    if panos_device.content_version is None:
+        panos_device.refresh_system_info()
+
+
+def set_operation_target(panos_device, target_cmd, target_purpose, output):
+    """
+    Sets the target (Template, Device Group or VSYS) of the config and commit locks taken or removed next.
+
+    The program exits if the target cannot be set.
+
+    Args:
+        panos_device: Firewall or Panorama device object.
+        target_cmd: The op command that sets the target.
+        target_purpose: The word used in the error message ('policy' or 'operation').
+        output: The function that prints the result (console.print or print).
+    """
+    try:
+        target_result = panos_device.op(cmd=target_cmd, cmd_xml=False)
+    except PanDeviceXapiError as e:
+        output(f'Error while setting the {target_purpose} target: {e}\n')
+        sys.exit(1)
+    else:
+        output(f"{target_result.attrib["status"]}")
+
+
+def take_config_and_commit_locks(panos_device):
+    """
+    Takes the config and commit locks on the target set by set_operation_target().
+
+    The PAN-OS XML API accepts one operational command per request, and each lock applies to the target
+    set just before it. So the two locks are taken with two calls and cannot be merged with the target setting.
+    The program exits if a lock cannot be taken (unless the lock is already owned by the user).
+    """
+    lock_comment = f"<comment>Policy revision {settings.POLICY_VERSION} ({settings.POLICY_DATE}) rollout</comment>"
+    console.print(f'Taking CONFIG and COMMIT locks on the target...', end='')
+    try:
+        config_lock_result  = panos_device.op(cmd=f"<request><config-lock><add>{lock_comment}</add></config-lock></request>", cmd_xml=False)
+        commit_lock_result  = panos_device.op(cmd=f"<request><commit-lock><add>{lock_comment}</add></commit-lock></request>", cmd_xml=False)
+    except PanDeviceXapiError as e:
+        if "You already own a config lock for scope" in str(e):
+            console.print("Already have the lock, continuing...\n")
+        else:
+            console.print(f"Error while taking the lock: {e}\n")
+            sys.exit(1)
+    else:
+        console.print(f"[{config_lock_result.attrib['status']}] for config lock and [{commit_lock_result.attrib['status']}] for commit lock.")
+
+
+def remove_config_and_commit_locks(panos_device):
+    """
+    Removes the config and commit locks from the target set by set_operation_target().
+
+    The program exits if a lock cannot be removed.
+    """
+    print(f'Removing CONFIG and COMMIT locks from the target...', end='')
+    try:
+        config_lock_result  = panos_device.op(cmd=f"<request><config-lock><remove></remove></config-lock></request>", cmd_xml=False)
+        commit_lock_result  = panos_device.op(cmd=f"<request><commit-lock><remove></remove></commit-lock></request>", cmd_xml=False)
+    except PanDeviceXapiError as e:
+        print(f'Error while removing the lock: {e}\n')
+        sys.exit(1)
+    else:
+        print(f"[{config_lock_result.attrib['status']}] for config lock removal and [{commit_lock_result.attrib['status']}] for commit lock removal.")
+
+
 def build_policy(panos_device, policy_container, policy_template, app_categories_requirements, url_categories_requirements, current_url_categories, target_environment):
     """
     Constructs and manages security and decryption policies, address objects, and address groups on a PAN-OS device.
@@ -217,8 +473,8 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
         target_environment:             The target environment for applying the policies (prod|lab etc.)
     """
 
-    # Get system info
-    panos_device.refresh_system_info()
+    # Get system info (only once per device object, even if the policy is built for several containers)
+    refresh_system_info_once(panos_device)
 
     if settings.PRIVACY_MODE:
         console.print(Panel.fit(f"Connected to {panos_device.platform} (PAN-OS {panos_device.version}, Content v{panos_device.content_version}, S/N {panos_device.serial})"))
@@ -227,8 +483,11 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
     console.print(Panel.fit(f"Target for the policy: {policy_container}"))
 
 
+    # The device type is checked only once - all Panorama- and firewall-specific steps below depend on it
+    is_panorama = isinstance(panos_device, Panorama)
+
     # Create Device Group or VSYS object
-    if isinstance(panos_device, Panorama):
+    if is_panorama:
         # for Panorama the target is a DeviceGroup, and the target_template is a Template
         target          = DeviceGroup(policy_container)
         target_template = Template(policy_template)
@@ -243,71 +502,33 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
 
     # =================================================================================================================
     # =================================================================================================================
-    # Set the target template for Panorama for commit and config locks to be taken
-    console.print(f"Setting the target ", end="")
-    if isinstance(panos_device, Panorama):
-        console.print("template...", end="")
-        try:
-            tp_target_result    = panos_device.op(cmd=f"<set><system><setting><target><template><name>{policy_template}</name></template></target></setting></system></set>", cmd_xml=False)
-        except PanDeviceXapiError as e:
-            console.print(f'Error while setting the policy target: {e}\n')
-            sys.exit(1)
-        else:
-            console.print(f"{tp_target_result.attrib["status"]}")
-
-    # Set the target VSYS for firewall for commit and config locks to be taken
+    # The op commands that set the target are built once (they are used to take and then to remove the locks)
+    # (the template target is only used on Panorama, the VSYS target only on a firewall)
+    if is_panorama:
+        template_target_cmd     = f"<set><system><setting><target><template><name>{policy_template}</name></template></target></setting></system></set>"
+        device_group_target_cmd = f"<set><system><setting><target><device-group>{policy_container}</device-group></target></setting></system></set>"
     else:
-        console.print("VSYS...", end="")
-        try:
-            vsys_target_result = panos_device.op(cmd=f"<set><system><setting><target-vsys>{policy_template}</target-vsys></setting></system></set>", cmd_xml=False)
-        except PanDeviceXapiError as e:
-            console.print(f'Error while setting the policy target: {e}\n')
-            sys.exit(1)
-        else:
-            console.print(f"{vsys_target_result.attrib["status"]}")
+        template_target_cmd     = f"<set><system><setting><target-vsys>{policy_template}</target-vsys></setting></system></set>"
+        device_group_target_cmd = None
+
+    # Set the target template for Panorama (or the target VSYS for firewall) for commit and config locks to be taken
+    console.print(f"Setting the target ", end="")
+    console.print("template..." if is_panorama else "VSYS...", end="")
+    set_operation_target(panos_device, template_target_cmd, "policy", console.print)
 
     # Take the config and commit lock for the set target (Template or VSYS))
-    console.print(f'Taking CONFIG and COMMIT locks on the target...', end='')
-    try:
-        config_lock_result  = panos_device.op(cmd=f"<request><config-lock><add><comment>Policy revision {settings.POLICY_VERSION} ({settings.POLICY_DATE}) rollout</comment></add></config-lock></request>", cmd_xml=False)
-        commit_lock_result  = panos_device.op(cmd=f"<request><commit-lock><add><comment>Policy revision {settings.POLICY_VERSION} ({settings.POLICY_DATE}) rollout</comment></add></commit-lock></request>", cmd_xml=False)
-    except PanDeviceXapiError as e:
-        if "You already own a config lock for scope" in str(e):
-            console.print("Already have the lock, continuing...\n")
-            # Maybe do something else or just carry on here
-        else:
-            console.print(f"Error while taking the lock: {e}\n")
-            sys.exit(1)
-    else:
-        console.print(f"[{config_lock_result.attrib['status']}] for config lock and [{commit_lock_result.attrib['status']}] for commit lock.")
+    take_config_and_commit_locks(panos_device)
 
 
     # Now we set the target Device Group on Panorama for commit and config locks to be taken
     # we do not need to do this for the VSYS as all possible locks have already been taken
     console.print(f"Setting the target ", end="")
-    if isinstance(panos_device, Panorama):
+    if is_panorama:
         console.print("device group...", end="")
-        try:
-            dg_target_result    = panos_device.op(cmd=f"<set><system><setting><target><device-group>{policy_container}</device-group></target></setting></system></set>", cmd_xml=False)
-        except PanDeviceXapiError as e:
-            console.print(f'Error while setting the policy target: {e}\n')
-            sys.exit(1)
-        else:
-            console.print(f"{dg_target_result.attrib["status"]}")
+        set_operation_target(panos_device, device_group_target_cmd, "policy", console.print)
 
         # Take the config and commit lock for the specified target
-        console.print(f'Taking CONFIG and COMMIT locks on the target...', end='')
-        try:
-            config_lock_result  = panos_device.op(cmd=f"<request><config-lock><add><comment>Policy revision {settings.POLICY_VERSION} ({settings.POLICY_DATE}) rollout</comment></add></config-lock></request>", cmd_xml=False)
-            commit_lock_result  = panos_device.op(cmd=f"<request><commit-lock><add><comment>Policy revision {settings.POLICY_VERSION} ({settings.POLICY_DATE}) rollout</comment></add></commit-lock></request>", cmd_xml=False)
-        except PanDeviceXapiError as e:
-            if "You already own a config lock for scope" in str(e):
-                console.print("Already have the lock, continuing...\n")
-            else:
-                console.print(f"Error while taking the lock: {e}\n")
-                sys.exit(1)
-        else:
-            console.print(f"[{config_lock_result.attrib['status']}] for config lock and [{commit_lock_result.attrib['status']}] for commit lock.")
+        take_config_and_commit_locks(panos_device)
 
     # By this point we should have 4 locks on Panorama (commit and config on Template and Device Group)
     # and 2 locks on firewall (commit and config on VSYS)
@@ -315,7 +536,7 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
     # =================================================================================================================
 
     # Setup rulebases
-    if isinstance(panos_device, Panorama):
+    if is_panorama:
         rulebase_pre = PreRulebase()
         rulebase_post = PostRulebase()
         target.add(rulebase_pre)
@@ -327,12 +548,14 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
         rulebases = rulebase
 
     # Discover all policy types and delete them if required (controlled by DELETE_CURRENT_<type>_POLICY flags)
-    _, security_rules_uuids     = discover_and_delete_policy_rules(panos_device, rulebases, 'security')
-    _, decryption_rules_uuids   = discover_and_delete_policy_rules(panos_device, rulebases, 'decryption')
-    _, nat_rules_uuids          = discover_and_delete_policy_rules(panos_device, rulebases, 'nat')
-    _, auth_rules_uuids         = discover_and_delete_policy_rules(panos_device, rulebases, 'authentication')
-    _, pbf_rules_uuids          = discover_and_delete_policy_rules(panos_device, rulebases, 'pbf')
-    _, _                        = discover_and_delete_policy_rules(panos_device, rulebases, 'override')
+    # (the rules of all types are retrieved at once - one API call per rulebase)
+    discover_all_policy_rules(panos_device, rulebases)
+    _, security_rules_uuids     = discover_and_delete_policy_rules(panos_device, rulebases, 'security', refresh=False)
+    _, decryption_rules_uuids   = discover_and_delete_policy_rules(panos_device, rulebases, 'decryption', refresh=False)
+    _, nat_rules_uuids          = discover_and_delete_policy_rules(panos_device, rulebases, 'nat', refresh=False)
+    _, auth_rules_uuids         = discover_and_delete_policy_rules(panos_device, rulebases, 'authentication', refresh=False)
+    _, pbf_rules_uuids          = discover_and_delete_policy_rules(panos_device, rulebases, 'pbf', refresh=False)
+    _, _                        = discover_and_delete_policy_rules(panos_device, rulebases, 'override', refresh=False)
 
     # =====================================================================================================
     print("Proceeding with the policy creation...")
@@ -344,17 +567,7 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
     with console.status("Retrieving current tags...", spinner="dots") as status_spinner:
         current_tags = Tag.refreshall(target)
         status_spinner.update("Retrieving current tags...completed")
-    if settings.BULK_TAG_DELETION:
-        delete_objects(panos_device, current_tags, "soft")
-        for tag in current_tags or []: target.remove(tag)
-    else:
-        for tag in tqdm(current_tags or [], desc="Deleting tags", ncols=100, colour='white'):
-            try:
-                tag.delete()
-            except PanDeviceXapiError as e:
-                tqdm.write(f"Failed to delete the tag [{tag.name}]")
-                if settings.DEBUG_OUTPUT:
-                    tqdm.write(str(e))
+    delete_and_detach_objects(panos_device, target, current_tags, "soft", chunk_size=bulk_deletion_chunk_size(settings.BULK_TAG_DELETION))
     # now, as all old tasgs are deleted, we proceed with (re)creating tags from code
     create_tags(target, panos_device)
 
@@ -363,43 +576,32 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
     # Groups must be deleted first as they may contain filters
     # Some groups may contain nested application groups. If we attempt to delete
     # nested application group before we delete their parents (even within the same multi-config operation)
-    # the whole operation will fail. The workaround is to identify these container groups and delete them first.
-    #
-    # There is no recursion beyond one nested level in the algorythm below.
-    # For example, if you have a group within a group within another group, the deletion may fail on one of them.
+    # the whole operation will fail. So the groups are deleted in layers: first the groups that are not nested
+    # in any other group, then the groups that were nested only in the first layer, and so on
+    # (any depth of nesting is supported).
     #
-    # a) enumerate all container application groups
+    # a) enumerate all application groups and b) store their names and values in a dictionary
+    # (only the names and members are read from the XML, the full SDK objects are not needed here)
     with console.status("Retrieving current application groups...", spinner="dots") as status_spinner:
-        current_application_groups = ApplicationGroup.refreshall(target)
+        application_groups = get_application_group_members(panos_device, target)
         status_spinner.update("Retrieving application groups...completed")
-    application_groups = {} # dictionary
-
-    # b) store their names and values in a dictionary
-    for application_group in current_application_groups:
-        application_groups[application_group.name] = application_group.value
-
-    # c) identify names of the application groups that contain other application groups
-    container_application_group_names = set() # set
-    for name in application_groups.keys():
-        for value in application_groups[name]:
-            if value in application_groups.keys():
-                container_application_group_names.add(name)
+    # the group objects need only the name to be deleted
+    # (they are indexed by name, so that the groups of each layer can be looked up without scanning the target's children)
+    application_groups_by_name = {name: target.add(ApplicationGroup(name)) for name in application_groups}
+    current_application_groups = list(application_groups_by_name.values())
 
-    # d) find application group objects with these names
-    container_application_groups = []
-    for name in container_application_group_names:
-        container_application_groups.append(target.find(name, ApplicationGroup))
+    # c) split the groups into deletion layers (each group comes after all groups it is nested in)
+    application_group_layers = order_application_groups_for_deletion(application_groups)
 
-    # e) delete them
-    delete_objects(panos_device, container_application_groups)
+    # d,e) delete the groups layer by layer (one multi-config call per layer)
+    for application_group_layer in application_group_layers:
+        delete_objects(panos_device, [application_groups_by_name[name] for name in application_group_layer])
 
-    # f) delete the remaining (non-container) app groups and filters
-    current_application_groups = ApplicationGroup.refreshall(target)
+    # f) delete the app filters
     current_application_filters = ApplicationFilter.refreshall(target)
-    delete_objects(panos_device, current_application_groups)
-    delete_objects(panos_device, current_application_filters)
-    for application_group  in current_application_groups  or []: target.remove(application_group)
-    for application_filter in current_application_filters or []: target.remove(application_filter)
+    delete_and_detach_objects(panos_device, target, current_application_filters)
+    # all groups are deleted by now
+    detach_objects(target, current_application_groups)
 
     # 4,5,6) Now we need to delete security profiles (amongst other objects) because they may reference an address object
     # or EDL that we may need to delete at the next steps
@@ -410,16 +612,8 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
 
     # 7) delete and (re)create Log Forwarding Profiles (LFP)
     current_log_forwarding_profiles = LogForwardingProfile.refreshall(target)
-    if settings.BULK_LFP_DELETION:
-        delete_objects(panos_device, current_log_forwarding_profiles, "soft")
-        for log_forwarding_profile in current_log_forwarding_profiles or []: target.remove(log_forwarding_profile)
-    else:
-        for log_forwarding_profile in tqdm(current_log_forwarding_profiles or [], desc="Deleting log forwarding profiles", ncols=100, colour='white'):
-            try:
-                log_forwarding_profile.delete()
-            except PanDeviceXapiError as e:
-                tqdm.write(f"Failed to delete the Log Forwarding Profile [{log_forwarding_profile.name}]")
-                if settings.DEBUG_OUTPUT: tqdm.write(str(e))
+    delete_and_detach_objects(panos_device, target, current_log_forwarding_profiles, "soft",
+                              chunk_size=bulk_deletion_chunk_size(settings.BULK_LFP_DELETION))
     create_log_forwarding_profiles(target, panos_device)
 
     # 8-9) Then we "synchronize" objects in the code and on the device.
@@ -442,18 +636,28 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
     # 12-13) create app filters and groups
     # filters must be created before groups because they are referenced in the groups
     # groups may contain custom applications imported at the previous step
-    create_application_filters(target, panos_device, app_categories_requirements)
-    create_application_groups(target, panos_device, app_categories_requirements)
+    # (both are sent to the device in a single Multi-Config API call)
+    create_application_filters_and_groups(target, panos_device, app_categories_requirements)
 
     # 14) Import custom response pages
     # (target_template here is either a Template or Vsys class instance)
     import_custom_response_pages(target_template, panos_device, target_environment)
 
 
-    # 15) delete and (re)create all EDLs
-    current_edls = Edl.refreshall(target)
-    delete_objects(panos_device, current_edls)
-    for edl in current_edls or []: target.remove(edl)
+    # 15-17) EDLs, custom URL categories, service groups and service objects are independent of each other,
+    # so the current objects of all four types are retrieved in parallel
+    with console.status("Retrieving current EDLs, custom URL categories and services...", spinner="dots") as status_spinner:
+        current_objects = refresh_objects_concurrently(panos_device, target, (Edl, CustomUrlCategory, ServiceGroup, ServiceObject))
+        status_spinner.update("Retrieving current EDLs, custom URL categories and services...completed")
+
+    # The current objects of these four types are deleted with a single multi-config call
+    # (service groups must be deleted before the service objects they reference)
+    objects_to_delete = (current_objects[Edl] + current_objects[CustomUrlCategory] +
+                         current_objects[ServiceGroup] + current_objects[ServiceObject])
+    delete_objects_in_one_call(panos_device, objects_to_delete)
+    detach_objects(target, objects_to_delete)
+
+    # 15) (re)create all EDLs
     create_edls(target, panos_device, target_environment)
     #                                 ^^^^^^^^^^^^^^^^^^
     # target_environment parameter is effectively a string that substitutes
@@ -465,22 +669,10 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
     # Thus, you can have a Lab firewall with a policy identical to your Prod and be able to test the policy
     # elements referencing the EDLs by changing the Lab instances of the EDLs instead of Prod.
 
-    # 16) delete and (re)create all custom URL categories
-    current_custom_url_categories = CustomUrlCategory.refreshall(target)
-    delete_objects(panos_device, current_custom_url_categories)
-    for custom_url_category in current_custom_url_categories or []: target.remove(custom_url_category)
+    # 16) (re)create all custom URL categories
     create_custom_url_categories(target, panos_device, url_categories_requirements)
 
-    # 17) delete and (re)create all service objects and groups
-    current_service_groups = ServiceGroup.refreshall(target)
-    delete_objects(panos_device, current_service_groups)
-    for service_group in current_service_groups or []: target.remove(service_group)
-
-    # service groups must be deleted before the service object
-    current_service_objects = ServiceObject.refreshall(target)
-    delete_objects(panos_device, current_service_objects)
-    for service_object in current_service_objects or []: target.remove(service_object)
-
+    # 17) (re)create all service objects and groups
     create_service_objects(target, panos_device)
 
     # 18,19) create all security profiles
@@ -516,53 +708,33 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
     policy_rules_pre = []
     policy_rules_post = []
 
-    # Stage security rules (always created in the original code)
-    print("Staging security policy rules:")
-    if settings.CREATE_SECURITY_POLICY:
-        sec_pre, sec_post = create_security_rules(panos_device, app_categories_requirements, url_categories_requirements, security_rules_uuids, target_environment)
-        policy_rules_pre.extend(sec_pre)
-        policy_rules_post.extend(sec_post)
-
-    # Stage decryption policy rules (if required)
-    if ((isinstance(panos_device, Panorama) and settings.CREATE_DECRYPTION_POLICY_PANORAMA) or
-            (isinstance(panos_device, Firewall) and settings.CREATE_DECRYPTION_POLICY_FIREWALL)):
-        print("Staging decryption policy rules:")
-        dec_pre, dec_post = create_decryption_rules(panos_device, target_environment)
-        policy_rules_pre.extend(dec_pre)
-        policy_rules_post.extend(dec_post)
-
-    # Stage NAT rules if required
-    if settings.CREATE_NAT_POLICY:
-        print("Staging NAT policy rules:")
-        nat_pre, nat_post = create_nat_rules(panos_device, target_environment)
-        policy_rules_pre.extend(nat_pre)
-        policy_rules_post.extend(nat_post)
-
-    # Stage authentication rules if required
-    if settings.CREATE_AUTHENTICATION_POLICY:
-        print("Staging authentication policy rules:")
-        auth_pre, auth_post = create_authentication_rules(panos_device, target_environment)
-        policy_rules_pre.extend(auth_pre)
-        policy_rules_post.extend(auth_post)
-
-    # Stage application override rules if required
-    if settings.CREATE_OVERRIDE_POLICY:
-        print("Staging application override policy rules:")
-        override_pre, override_post = create_override_rules(panos_device, target_environment)
-        policy_rules_pre.extend(override_pre)
-        policy_rules_post.extend(override_post)
-
-    # Stage Policy-Based Forwarding rules if required
-    if settings.CREATE_PBF_POLICY:
-        print("Staging PBF policy rules:")
-        bpf_pre, pbf_post = create_pbf_rules(panos_device, target_environment)
-        policy_rules_pre.extend(bpf_pre)
-        policy_rules_post.extend(pbf_post)
+    # The rule stagers: (policy name for the output, flag that enables the stager, staging function, its arguments).
+    # They are run one after another in this order, so the staged rules keep the order of the policy types.
+    # (they are not run in parallel: the stagers import the rule modules and print their progress to the console)
+    rule_stagers = (
+        ("security",                settings.CREATE_SECURITY_POLICY,        create_security_rules,
+            (panos_device, app_categories_requirements, url_categories_requirements, security_rules_uuids, target_environment)),
+        ("decryption",              settings.CREATE_DECRYPTION_POLICY_PANORAMA if is_panorama else settings.CREATE_DECRYPTION_POLICY_FIREWALL,
+                                                                            create_decryption_rules,        (panos_device, target_environment)),
+        ("NAT",                     settings.CREATE_NAT_POLICY,             create_nat_rules,               (panos_device, target_environment)),
+        ("authentication",          settings.CREATE_AUTHENTICATION_POLICY,  create_authentication_rules,    (panos_device, target_environment)),
+        ("application override",    settings.CREATE_OVERRIDE_POLICY,        create_override_rules,          (panos_device, target_environment)),
+        ("PBF",                     settings.CREATE_PBF_POLICY,             create_pbf_rules,               (panos_device, target_environment)),
+    )
+
+    # Stage the rules of all enabled policy types
+    for policy_name, stager_enabled, stage_rules, stager_arguments in rule_stagers:
+        if not stager_enabled:
+            continue
+        print(f"Staging {policy_name} policy rules:")
+        rules_pre, rules_post = stage_rules(*stager_arguments)
+        policy_rules_pre.extend(rules_pre)
+        policy_rules_post.extend(rules_post)
 
     # Attach policy rules to the rulebase
     print("Staging policy rules...", end='')
 
-    if isinstance(panos_device, Panorama):
+    if is_panorama:
         for rule in policy_rules_pre:   rulebase_pre.add(rule)
         for rule in policy_rules_post:  rulebase_post.add(rule)
     else:
@@ -593,7 +765,7 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
     print('done.')
 
     # creation of the policy rules
-    execute_multi_config_api_call(panos_device, multi_config_xml, "Creating the staged rules...", 0)
+    execute_multi_config_api_call(panos_device, multi_config_xml, "Creating the staged rules...", 0, num_operations=action_id - 1)
     print("Building new policy: COMPLETED")
 
     # =================================================================================================================
@@ -601,60 +773,21 @@ def build_policy(panos_device, policy_container, policy_template, app_categories
     # 22) Now, we remove all locks
     # First, we do this for templates and VSYSes
     print(f"Setting the target ", end="")
-    if isinstance(panos_device, Panorama):
-        print("template for lock removal...", end="")
-        try:
-            tp_target_result    = panos_device.op(cmd=f"<set><system><setting><target><template><name>{policy_template}</name></template></target></setting></system></set>", cmd_xml=False)
-        except PanDeviceXapiError as e:
-            print(f'Error while setting the operation target: {e}\n')
-            sys.exit(1)
-        else:
-            print(f"{tp_target_result.attrib["status"]}")
-    # Set the target VSYS for firewall for commit and config locks to be taken
-    else:
-        print("VSYS for lock removal...", end="")
-        try:
-            vsys_target_result = panos_device.op(cmd=f"<set><system><setting><target-vsys>{policy_template}</target-vsys></setting></system></set>", cmd_xml=False)
-        except PanDeviceXapiError as e:
-            print(f'Error while setting the operation target: {e}\n')
-            sys.exit(1)
-        else:
-            print(f"{vsys_target_result.attrib["status"]}")
+    print("template for lock removal..." if is_panorama else "VSYS for lock removal...", end="")
+    set_operation_target(panos_device, template_target_cmd, "operation", print)
 
     # Remove the config and commit lock for the set target (Template or VSYS))
-    print(f'Removing CONFIG and COMMIT locks from the target...', end='')
-    try:
-        config_lock_result  = panos_device.op(cmd=f"<request><config-lock><remove></remove></config-lock></request>", cmd_xml=False)
-        commit_lock_result  = panos_device.op(cmd=f"<request><commit-lock><remove></remove></commit-lock></request>", cmd_xml=False)
-    except PanDeviceXapiError as e:
-        print(f'Error while removing the lock: {e}\n')
-        sys.exit(1)
-    else:
-        print(f"[{config_lock_result.attrib['status']}] for config lock removal and [{commit_lock_result.attrib['status']}] for commit lock removal.")
+    remove_config_and_commit_locks(panos_device)
 
 
     # Now we set the target Device Group on Panorama for commit and config locks to be removed
     # we do not need to do this for the VSYS as all possible locks have already been removed
-    if isinstance(panos_device, Panorama):
+    if is_panorama:
         print("Setting the target device group for lock removal...", end="")
-        try:
-            dg_target_result    = panos_device.op(cmd=f"<set><system><setting><target><device-group>{policy_container}</device-group></target></setting></system></set>", cmd_xml=False)
-        except PanDeviceXapiError as e:
-            print(f'Error while setting the operation target: {e}\n')
-            sys.exit(1)
-        else:
-            print(f"{dg_target_result.attrib["status"]}")
+        set_operation_target(panos_device, device_group_target_cmd, "operation", print)
 
-        # Take the config and commit lock for the specified target
-        print(f'Removing CONFIG and COMMIT locks from the target...', end='')
-        try:
-            config_lock_result  = panos_device.op(cmd=f"<request><config-lock><remove></remove></config-lock></request>", cmd_xml=False)
-            commit_lock_result  = panos_device.op(cmd=f"<request><commit-lock><remove></remove></commit-lock></request>", cmd_xml=False)
-        except PanDeviceXapiError as e:
-            print(f'Error while removing the lock: {e}\n')
-            sys.exit(1)
-        else:
-            print(f"[{config_lock_result.attrib['status']}] for config lock removal and [{commit_lock_result.attrib['status']}] for commit lock removal.")
+        # Remove the config and commit lock for the specified target
+        remove_config_and_commit_locks(panos_device)
     #
     # Now all set locks should be removed
     # ================================================================================================================
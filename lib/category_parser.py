@@ -6,10 +6,15 @@ what categories should be allowed for all users, and what categories should be b
 
 import os.path
 import csv
+from collections import namedtuple
 
 import settings
 
 
+# App category row with the fields used to stage application filters and groups, parsed once per run
+AppCategory = namedtuple('AppCategory', 'name subcategory action action_label categories tags risks excluded_apps extra_apps')
+
+
 def parse_app_categories(filename):
     """
     Reads App categories from the input CSV file and builds a list of dictionaries with metadata.
@@ -70,3 +75,43 @@ def parse_url_categories(filename):
         categories = None
 
     return categories
+
+
+def split_comma_separated_field(value):
+    """
+    Splits a comma-separated cell of a categories CSV file into a list of stripped values.
+
+    Empty members (e.g. produced by stray or trailing commas) are dropped.
+
+    Args:
+        value (str): Cell value, e.g. "saas, collaboration".
+
+    Returns:
+        list or None: List of values, or None if the cell holds no values at all.
+    """
+    return [item for item in (item.strip() for item in value.split(',')) if item] or None
+
+
+def normalize_app_categories(app_categories):
+    """
+    Converts App categories read by parse_app_categories() into AppCategory tuples.
+
+    Case normalization and splitting of the comma-separated fields are done here once,
+    so the application filters and groups can be staged from the same list.
+
+    Args:
+        app_categories (list): List of dictionaries with app categories metadata.
+
+    Returns:
+        list: List of AppCategory tuples (1 tuple per category).
+    """
+    return [AppCategory(name            = category["SubCategory"],
+                        subcategory     = category["SubCategory"].lower(),
+                        action          = category["Action"].lower(),
+                        action_label    = category["Action"],
+                        categories      = split_comma_separated_field(category["Category"].lower()),
+                        tags            = split_comma_separated_field(category["Tags"]),
+                        risks           = split_comma_separated_field(category["Risk"]),
+                        excluded_apps   = split_comma_separated_field(category["ExcludedApps"]),
+                        extra_apps      = split_comma_separated_field(category["ExtraApps"]))
+            for category in app_categories]
@@ -1,3 +1,7 @@
 from rich.console    import Console
 
 console = Console()
+
+# Console for bulk progress output that contains no Rich markup - markup parsing and
+# highlighting are disabled so that every line is written to the terminal as is
+plain_console = Console(highlight=False, markup=False, soft_wrap=True)
@@ -20,6 +20,19 @@ from lib.auxiliary_functions         import parse_metadata_from_json, execute_mu
 from rich import print
 
 
+def members_xml(members):
+    """
+    Builds the sequence of <member> nodes for a list of URL categories.
+
+    Args:
+        members: List of URL category names.
+
+    Returns:
+        str: XML string with one <member> node per category (an empty string for an empty list).
+    """
+    return "".join(f"<member>{member}</member>" for member in members)
+
+
 def create_url_filtering_static_profiles(profile_container, current_url_categories, panos_device):
     """
     Analyzes URL filtering profiles and creates static URL filtering security profiles on a PAN-OS device.
@@ -60,12 +73,12 @@ def create_url_filtering_static_profiles(profile_container, current_url_categori
                     category_list_for_validation = current_url_categories.copy()
                     # first of all, we construct the XPATH component of our API call
                     # Categories per security action
-                    alert = ""
+                    alert_members = []
                     if "alert" in profile:
                         for a1 in profile['alert']:
                             a1 = a1.strip()
                             if a1 in current_url_categories:
-                                alert = alert + "<member>" + a1 + "</member>"
+                                alert_members.append(a1)
                                 if a1 in category_list_for_validation:
                                     category_list_for_validation.remove(a1)
                                 else:
@@ -74,14 +87,14 @@ def create_url_filtering_static_profiles(profile_container, current_url_categori
                             else:
                                 print(f"\t\tCategory '{a1}' is invalid and will be skipped (check the spelling)")
 
-                    if alert != "": alert = "<alert>" + alert + "</alert>"
+                    alert = "<alert>" + members_xml(alert_members) + "</alert>" if alert_members else ""
 
-                    allow = ""
+                    allow_members = []
                     if "allow" in profile:
                         for a2 in profile['allow']:
                             a2 = a2.strip()
                             if a2 in current_url_categories:
-                                allow = allow + "<member>" + a2 + "</member>"
+                                allow_members.append(a2)
                                 if a2 in category_list_for_validation:
                                     category_list_for_validation.remove(a2)
                                 else:
@@ -90,14 +103,14 @@ def create_url_filtering_static_profiles(profile_container, current_url_categori
                             else:
                                 print(f"\t\tCategory '{a2}' is invalid and will be skipped (check the spelling)")
 
-                    if allow != "": allow = "<allow>" + allow + "</allow>"
+                    allow = "<allow>" + members_xml(allow_members) + "</allow>" if allow_members else ""
 
-                    block = ""
+                    block_members = []
                     if "block" in profile:
                         for b in profile['block']:
                             b = b.strip()
                             if b in current_url_categories:
-                                block = block + "<member>" + b + "</member>"
+                                block_members.append(b)
                                 if b in category_list_for_validation:
                                     category_list_for_validation.remove(b)
                                 else:
@@ -105,14 +118,14 @@ def create_url_filtering_static_profiles(profile_container, current_url_categori
                                     sys.exit(1)
                             else:
                                 print(f"\t\tCategory '{b}' is invalid and will be skipped (check the spelling)")
-                    if block != "": block = "<block>" + block + "</block>"
+                    block = "<block>" + members_xml(block_members) + "</block>" if block_members else ""
 
-                    cont = ""
+                    cont_members = []
                     if "continue" in profile:
                         for c in profile['continue']:
                             c = c.strip()
                             if c in current_url_categories:
-                                cont = cont + "<member>" + c + "</member>"
+                                cont_members.append(c)
                                 if c in category_list_for_validation:
                                     category_list_for_validation.remove(c)
                                 else:
@@ -120,14 +133,14 @@ def create_url_filtering_static_profiles(profile_container, current_url_categori
                                     sys.exit(1)
                             else:
                                 print(f"\t\tCategory '{c}' is invalid and will be skipped (check the spelling)")
-                    if cont != "": cont = "<continue>" + cont + "</continue>"
+                    cont = "<continue>" + members_xml(cont_members) + "</continue>" if cont_members else ""
 
-                    override = ""
+                    override_members = []
                     if "override" in profile:
                         for o in profile['override']:
                             o = o.strip()
                             if o in current_url_categories:
-                                override = override + "<member>" + o + "</member>"
+                                override_members.append(o)
                                 if o in category_list_for_validation:
                                     category_list_for_validation.remove(o)
                                 else:
@@ -135,7 +148,7 @@ def create_url_filtering_static_profiles(profile_container, current_url_categori
                                     sys.exit(1)
                             else:
                                 print(f"\t\tCategory '{o}' is invalid and will be skipped (check the spelling)")
-                    if override != "": override = "<override>" + override + "</override>"
+                    override = "<override>" + members_xml(override_members) + "</override>" if override_members else ""
 
                     # Check if there are any categories left in the list - if so, they are not defined in the profile
                     if category_list_for_validation:
@@ -148,10 +161,10 @@ def create_url_filtering_static_profiles(profile_container, current_url_categori
                         # We re-create a copy of categories to ensure each category is used only once for UCS
                         category_list_for_validation = current_url_categories.copy()
 
-                        ucs_alert       = ""
-                        ucs_allow       = ""
-                        ucs_block       = ""
-                        ucs_continue    = ""
+                        ucs_alert_members       = []
+                        ucs_allow_members       = []
+                        ucs_block_members       = []
+                        ucs_continue_members    = []
                         ucs_mode        = ""
                         ucs_log_severity = ""
 
@@ -165,7 +178,7 @@ def create_url_filtering_static_profiles(profile_container, current_url_categori
                             for ua1 in profile["credential-enforcement"]["alert"]:
                                 ua1 = ua1.strip()
                                 if ua1 in current_url_categories:
-                                    ucs_alert = ucs_alert + "<member>" + ua1 + "</member>"
+                                    ucs_alert_members.append(ua1)
                                     if ua1 in category_list_for_validation:
                                         category_list_for_validation.remove(ua1)
                                     else:
@@ -173,13 +186,13 @@ def create_url_filtering_static_profiles(profile_container, current_url_categori
                                         sys.exit(1)
                                 else:
                                     print(f"\t\tCategory '{ua1}' is invalid and will be skipped (check the spelling)")
-                        ucs_alert = "<alert>" + ucs_alert + "</alert>"
+                        ucs_alert = "<alert>" + members_xml(ucs_alert_members) + "</alert>"
 
                         if "allow" in profile["credential-enforcement"]:
                             for ua2 in profile["credential-enforcement"]["allow"]:
                                 ua2 = ua2.strip()
                                 if ua2 in current_url_categories:
-                                    ucs_allow = ucs_allow + "<member>" + ua2 + "</member>"
+                                    ucs_allow_members.append(ua2)
                                     if ua2 in category_list_for_validation:
                                         category_list_for_validation.remove(ua2)
                                     else:
@@ -187,13 +200,13 @@ def create_url_filtering_static_profiles(profile_container, current_url_categori
                                         sys.exit(1)
                                 else:
                                     print(f"\t\tCategory '{ua2}' is invalid and will be skipped (check the spelling)")
-                        ucs_allow = "<allow>" + ucs_allow + "</allow>"
+                        ucs_allow = "<allow>" + members_xml(ucs_allow_members) + "</allow>"
 
                         if "block" in profile["credential-enforcement"]:
                             for ub in profile["credential-enforcement"]["block"]:
                                 ub = ub.strip()
                                 if ub in current_url_categories:
-                                    ucs_block = ucs_block + "<member>" + ub + "</member>"
+                                    ucs_block_members.append(ub)
                                     if ub in category_list_for_validation:
                                         category_list_for_validation.remove(ub)
                                     else:
@@ -201,13 +214,13 @@ def create_url_filtering_static_profiles(profile_container, current_url_categori
                                         sys.exit(1)
                                 else:
                                     print(f"\t\tCategory '{ub}' is invalid and will be skipped (check the spelling)")
-                        ucs_block = "<block>" + ucs_block + "</block>"
+                        ucs_block = "<block>" + members_xml(ucs_block_members) + "</block>"
 
                         if "continue" in profile["credential-enforcement"]:
                             for uc in profile["credential-enforcement"]["continue"]:
                                 uc = uc.strip()
                                 if uc in current_url_categories:
-                                    ucs_continue = ucs_continue + "<member>" + uc + "</member>"
+                                    ucs_continue_members.append(uc)
                                     if uc in category_list_for_validation:
                                         category_list_for_validation.remove(uc)
                                     else:
@@ -215,7 +228,7 @@ def create_url_filtering_static_profiles(profile_container, current_url_categori
                                         sys.exit(1)
                                 else:
                                     print(f"\t\tCategory '{uc}' is invalid and will be skipped (check the spelling)")
-                        ucs_continue = "<continue>" + ucs_continue + "</continue>"
+                        ucs_continue = "<continue>" + members_xml(ucs_continue_members) + "</continue>"
 
                         ucs = '<credential-enforcement>' + ucs_mode + ucs_log_severity + ucs_alert + ucs_allow + ucs_block + ucs_continue + '</credential-enforcement>'
 
@@ -297,11 +310,11 @@ def create_url_filtering_auto_profiles(profile_container, url_categories, curren
     multi_config_xml = '<multi-config>'
 
     # 2. build profiles - auto-generated from managed URL categories
-    alert = ""
-    allow = ""
-    block = ""
-    cont = ""
-    override = ""
+    alert_members    = []
+    allow_members    = []
+    block_members    = []
+    cont_members     = []
+    override_members = []
 
     # First, we construct the XPATH components of the auto-generated profiles
     obj_xpath1 = profile_container.xpath() + "/profiles/url-filtering/entry[@name='" + settings.SP_URL_NON_CTRLD + "']"
@@ -323,15 +336,15 @@ def create_url_filtering_auto_profiles(profile_container, url_categories, curren
             if category_name in category_list_for_validation:
                 category_list_for_validation.remove(category_name)
                 if action == settings.url_action_alert:
-                    alert = alert + "<member>" + category_name + "</member>"
+                    alert_members.append(category_name)
                 elif action == settings.URL_ACTION_MANAGE or action == settings.URL_ACTION_DENY:
-                    block = block + "<member>" + category_name + "</member>"
+                    block_members.append(category_name)
                 elif action == settings.URL_ACTION_CONTINUE:
-                    cont  = cont + "<member>" + category_name + "</member>"
+                    cont_members.append(category_name)
                 elif action == settings.URL_ACTION_ALLOW:
-                    allow = allow + "<member>" + category_name + "</member>"
+                    allow_members.append(category_name)
                 elif action == settings.URL_ACTION_OVERRIDE:
-                    override = override + "<member>" + category_name + "</member>"
+                    override_members.append(category_name)
                 else:
                     print(f"ERROR: category [{category_name}] is specified with invalid action [{action}]."
                           f"\nValid actions are: [{settings.URL_ACTION_MANAGE}], [{settings.url_action_alert}], [{settings.URL_ACTION_DENY}], [{settings.URL_ACTION_CONTINUE}], [{settings.URL_ACTION_ALLOW}]. "
@@ -345,11 +358,11 @@ def create_url_filtering_auto_profiles(profile_container, url_categories, curren
             print(f"ERROR: category name [{category_name}] is invalid. Correct this name in the file [{settings.URL_CATEGORIES_REQUIREMENTS_FILENAME}] and re-run the script.")
             sys.exit(1)
 
-    alert = "<alert>" + alert + "</alert>"
-    block = "<block>" + block + "</block>"
-    cont = "<continue>" + cont + "</continue>"
-    allow = "<allow>" + allow + "</allow>"
-    override = "<override>" + override + "</override>"
+    alert = "<alert>" + members_xml(alert_members) + "</alert>"
+    block = "<block>" + members_xml(block_members) + "</block>"
+    cont = "<continue>" + members_xml(cont_members) + "</continue>"
+    allow = "<allow>" + members_xml(allow_members) + "</allow>"
+    override = "<override>" + members_xml(override_members) + "</override>"
 
     # UCS action is hard-coded to be identical to the main action (with the exception of Override)
     ucs_mode1         = "ip-user"
@@ -78,15 +78,17 @@ def create_service_objects(service_container, panos_device):
         # Creation of Service Object Groups
 
         # First, we build a deduped list of all service groups mentioned in the file
+        # (each group name is appended only the first time it's seen, so the order of appearance is preserved)
         all_service_groups = []
+        seen_service_groups = set()
         for service in service_objects:
 
             if service['Service Group Name'] != '' and (service['Protocol'].lower() == 'tcp' or service['Protocol'].lower() == 'udp'):
-                service_groups = service['Service Group Name'].split(',')
-                service_groups = [x.strip(' ') for x in service_groups]
-                all_service_groups = all_service_groups + service_groups
-
-        all_service_groups = list(dict.fromkeys(all_service_groups))
+                for service_group in service['Service Group Name'].split(','):
+                    service_group = service_group.strip(' ')
+                    if service_group not in seen_service_groups:
+                        seen_service_groups.add(service_group)
+                        all_service_groups.append(service_group)
 
         # Second, we take each service group and search for all service (group) objects that are members of this group
         if len(all_service_groups) != 0:
@@ -33,7 +33,7 @@ import json
 from lib.template_generator import generate_app_categories_template, generate_url_categories_template
 from lib.category_parser    import parse_app_categories, parse_url_categories
 from lib.build_policy   import build_policy
-from lib.auxiliary_functions import load_menu_options, display_menu, get_user_choice
+from lib.auxiliary_functions import load_menu_options, display_menu, get_user_choice, enable_xapi_connection_pooling
 
 import settings
 
@@ -198,6 +198,10 @@ def deploy_policy(selected_option, arguments, target_environment, panos_address,
     # Start execution timing (no interactive prompts expected after this point)
     start_time = time.time()
 
+    # Reuse the HTTPS connections for all XML API calls to the device (if enabled)
+    if settings.XAPI_CONNECTION_POOLING:
+        enable_xapi_connection_pooling()
+
     # Create appropriate PANOS device object based on deployment type
     # Handle different deployment scenarios based on device type
     # Panorama deployments require device group and template specification
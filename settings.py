@@ -64,6 +64,21 @@ BULK_RULE_DELETION              = True
 BULK_LFP_DELETION               = False
 BULK_TAG_DELETION               = False
 
+# Maximum number of objects deleted with a single multi-config call when a bulk deletion flag is set.
+# When the flag is not set, the objects are deleted one by one (one multi-config call per object).
+BULK_DELETION_CHUNK_SIZE        = 500
+
+# ====================================================================================
+# XML API connections
+# ====================================================================================
+
+# Reuse the HTTPS connections to the device for the XML API calls
+# (otherwise a new connection is opened, with a new TLS handshake, for every API call).
+# This replaces a private pan-python method, so it is skipped (with a warning) for pan-python versions other than
+# the ones listed below (major.minor) - add a version only after checking the pan.xapi internals it relies on
+XAPI_CONNECTION_POOLING                     = False
+XAPI_CONNECTION_POOLING_PAN_PYTHON_VERSIONS = ("0.24", "0.25", "0.26")
+
 BULK_ADDRESS_CREATION           = True
 
 # =================================================================================
@@ -180,6 +195,11 @@ URL_CATEGORIES_REQUIREMENTS_FILENAME       = "requirements/categories_url.csv"
 COOKIE_FILENAME                             = "misc/cookie.json"
 CA_BUNDLE                                   = "misc/mozilla-and-internal-ca-bundle.pem"
 
+# This file caches the response of the GitHub meta API (api.github.com/meta) along with its ETag
+# so that the addresses are downloaded again only when GitHub changes them
+# (it's a runtime file, so it's kept in the logs folder and is not tracked by git)
+GITHUB_META_CACHE_FILENAME                  = "logs/github_meta.json"
+
 # The script will generate the template files below if they are missing
 APP_CATEGORIES_TEMPLATE_FILENAME            = "requirements/templates/template_categories_app.csv"
 URL_CATEGORIES_TEMPLATE_FILENAME            = "requirements/templates/template_categories_url.csv"
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests of the helper functions in lib/auxiliary_functions.py that send XML API calls.
+
+The PAN-OS device is a Firewall object whose API handle is replaced with a fake one,
+so no API calls leave the machine.
+"""
+import sys
+import os
+import re
+
+import pytest
+
+# Add the project directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from panos.errors   import PanDeviceXapiError
+from panos.firewall import Firewall
+from panos.objects  import Tag, Edl, ServiceObject, ServiceGroup
+
+import settings
+from lib import auxiliary_functions
+
+
+class FakeXapi:
+    """API handle that records the multi-config calls and fails the deletion of the given object names."""
+
+    def __init__(self, failing_names=()):
+        self.failing_names = set(failing_names)
+        self.calls = []
+
+    def multi_config(self, multi_config_xml, strict=False):
+        self.calls.append(multi_config_xml)
+        failing = [name for name in self.failing_names if f"entry[@name='{name}']" in multi_config_xml]
+        if failing:
+            raise PanDeviceXapiError(f"{failing[0]} cannot be deleted")
+        return FakeResponse()
+
+
+class FakeResponse:
+    attrib = {"status": "success"}
+
+    def iterfind(self, path):
+        return iter(())
+
+
+@pytest.fixture
+def firewall(tmp_path, monkeypatch):
+    """Firewall with a fake API handle (the logs are written to a temporary directory)."""
+    monkeypatch.setattr(settings, "API_ERROR_LOG_FILENAME", str(tmp_path / "api_errors.log"))
+    monkeypatch.setattr(settings, "LOG_API_CALLS", False)
+    monkeypatch.setattr(settings, "DEBUG_OUTPUT", False)
+    monkeypatch.setattr(auxiliary_functions, "_first_multi_config_call", False)
+
+    panos_device = Firewall("192.0.2.1", api_key="key")
+    panos_device._xapi_private = FakeXapi()
+    return panos_device
+
+
+def add_tags(panos_device, names):
+    return [panos_device.add(Tag(name)) for name in names]
+
+
+def test_failure_summary_lists_the_failed_objects(firewall, capsys):
+    """The summary of failed deletions shows the log file and the names of the objects (as is, not as markup)."""
+    tags = add_tags(firewall, ["tag-1", "red", "/odd-name", "tag-4"])
+    firewall._xapi_private = FakeXapi(failing_names=["red", "/odd-name"])
+
+    auxiliary_functions.delete_objects(firewall, tags, failure_mode="soft", chunk_size=1)
+
+    output = capsys.readouterr().out
+    assert f"see the log file [{settings.API_ERROR_LOG_FILENAME}] for details" in output
+    assert "Failed to delete 2 tags" in output
+    assert "[red], [/odd-name]" in output
+    assert "[tag-1]" not in output and "[tag-4]" not in output
+
+
+def test_delete_objects_sends_one_call_per_chunk(firewall):
+    """The objects are deleted in chunks of chunk_size objects (one multi-config call per chunk)."""
+    tags = add_tags(firewall, [f"tag-{i}" for i in range(7)])
+
+    auxiliary_functions.delete_objects(firewall, tags, chunk_size=3)
+
+    calls = firewall._xapi_private.calls
+    assert [call.count("<delete ") for call in calls] == [3, 3, 1]
+    # every object is deleted once, in the original order
+    deleted = [name for call in calls for name in re.findall(r"/tag/entry\[@name='([^']+)'\]", call)]
+    assert deleted == [tag.name for tag in tags]
+
+
+def test_delete_objects_in_one_call_keeps_the_order_of_all_types(firewall):
+    """Objects of several types are deleted with a single call, in the given order."""
+    service_object = firewall.add(ServiceObject("svc-tcp-8080", protocol="tcp", destination_port="8080"))
+    service_group = firewall.add(ServiceGroup("SG-web", value=["svc-tcp-8080"]))
+    edl = firewall.add(Edl("EDL-blocked", source="https://example.com/list.txt"))
+
+    assert auxiliary_functions.delete_objects_in_one_call(firewall, [edl, service_group, service_object])
+
+    calls = firewall._xapi_private.calls
+    assert len(calls) == 1
+    assert re.findall(r'<delete id="(\d+)" xpath="([^"]+)">', calls[0]) == [
+        ("1", edl.xpath()), ("2", service_group.xpath()), ("3", service_object.xpath())]
+
+
+def test_delete_objects_in_one_call_without_objects(firewall):
+    """No API call is sent when there is nothing to delete."""
+    assert auxiliary_functions.delete_objects_in_one_call(firewall, [])
+    assert firewall._xapi_private.calls == []
+
+
+def test_delete_objects_in_one_call_reports_a_soft_failure(firewall):
+    """In the soft failure mode, a failed call is reported with the return value."""
+    tags = add_tags(firewall, ["tag-in-use"])
+    firewall._xapi_private = FakeXapi(failing_names=["tag-in-use"])
+
+    assert not auxiliary_functions.delete_objects_in_one_call(firewall, tags, failure_mode="soft")
+
+
+def test_parsed_metadata_is_cached_and_read_only(tmp_path):
+    """A file is parsed again only after it changes, and the cached data cannot be modified."""
+    csv_file = tmp_path / "objects.csv"
+    csv_file.write_text("Name,Members\nAPG-web,ssl\n", encoding="utf-8")
+
+    rows = auxiliary_functions.parse_metadata_from_csv("Objects", str(csv_file))
+    assert auxiliary_functions.parse_metadata_from_csv("Objects", str(csv_file)) is rows
+    assert rows == ({"Name": "APG-web", "Members": "ssl"},)
+    with pytest.raises(TypeError):
+        rows[0]["Name"] = "changed"
+    # a copy of a row can be modified
+    row = rows[0].copy()
+    row["Name"] = "changed"
+
+    csv_file.write_text("Name,Members\nAPG-mail,smtp\n", encoding="utf-8")
+    os.utime(csv_file, ns=(0, 0))
+    assert auxiliary_functions.parse_metadata_from_csv("Objects", str(csv_file)) == ({"Name": "APG-mail", "Members": "smtp"},)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
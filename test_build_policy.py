@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests of the helper functions in lib/build_policy.py that decide the order of deletions.
+"""
+import sys
+import os
+
+import pytest
+
+# Add the project directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from lib.build_policy import order_application_groups_for_deletion
+
+
+def as_sets(layers):
+    """The order of the groups within a layer does not matter (they are deleted with one call)."""
+    return [set(layer) for layer in layers]
+
+
+def deletion_position(layers):
+    """Returns the index of the layer of each group."""
+    return {name: index for index, layer in enumerate(layers) for name in layer}
+
+
+def test_groups_are_deleted_before_the_groups_nested_in_them():
+    """A group nested in another group is deleted in a later layer than the group containing it."""
+    application_groups = {
+        "APG-all":      ["APG-web", "APG-mail", "ssl"],
+        "APG-web":      ["APG-browsing", "web-browsing"],
+        "APG-browsing": ["google-base"],
+        "APG-mail":     ["smtp", "APG-browsing"],
+        "APG-single":   ["dns"],
+    }
+
+    layers = order_application_groups_for_deletion(application_groups)
+
+    assert as_sets(layers) == [{"APG-all", "APG-single"}, {"APG-web", "APG-mail"}, {"APG-browsing"}]
+    position = deletion_position(layers)
+    for group, members in application_groups.items():
+        for member in members:
+            if member in application_groups:
+                assert position[group] < position[member]
+
+
+def test_groups_without_nesting_form_a_single_layer():
+    """Groups that contain only applications (or nothing) are all deleted with one call."""
+    layers = order_application_groups_for_deletion({"APG-a": ["ssl"], "APG-b": None, "APG-c": []})
+
+    assert as_sets(layers) == [{"APG-a", "APG-b", "APG-c"}]
+
+
+def test_groups_in_a_reference_cycle_are_deleted_last():
+    """Groups in a cycle (not allowed by PAN-OS) are still returned, as the last layer."""
+    layers = order_application_groups_for_deletion({
+        "APG-top":    ["APG-loop-1"],
+        "APG-loop-1": ["APG-loop-2"],
+        "APG-loop-2": ["APG-loop-1"],
+    })
+
+    assert as_sets(layers) == [{"APG-top"}, {"APG-loop-1", "APG-loop-2"}]
+
+
+def test_no_groups():
+    assert order_application_groups_for_deletion({}) == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))